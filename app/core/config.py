@@ -1,6 +1,6 @@
 # app/core/config.py  (Pydantic v2)
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     debug: bool = Field(False, alias="DEBUG")
     host: str = Field("0.0.0.0", alias="HOST")
     port: int = Field(8080, alias="PORT")
+    debug_timing_enabled: bool = Field(True, alias="DEBUG_TIMING_ENABLED")  # allow per-request debug_timing traces
 
     # CORS
     cors_enabled: bool = Field(True, alias="CORS_ENABLED")
@@ -23,14 +24,67 @@ class Settings(BaseSettings):
     default_voice: str = Field("af_heart", alias="KOKORO_DEFAULT_VOICE")
     default_speed: float = Field(1.0, alias="KOKORO_DEFAULT_SPEED")
     default_sample_rate: int = Field(24000, alias="KOKORO_SAMPLE_RATE")
+    kokoro_repo_id: str = Field("hexgrad/Kokoro-82M", alias="KOKORO_REPO_ID")
+    device: Optional[str] = Field(None, alias="KOKORO_DEVICE")             # cpu | cuda (auto if unset)
+    snapshot_dir: str = Field("", alias="KOKORO_SNAPSHOT_DIR")            # mmap snapshot from scripts/build_snapshot.py
+
+    # Startup warmup; /readyz is 503 until it has finished
+    warmup_enabled: bool = Field(True, alias="WARMUP_ENABLED")
+    warmup_text: str = Field("Hello world. Warming up.", alias="WARMUP_TEXT")
+    preload_voices: str = Field("", alias="KOKORO_PRELOAD_VOICES")      # space/comma separated, default voice always
+
+    # Pipeline pool (one G2P front-end per lang_code, one shared model)
+    max_pipelines: int = Field(4, alias="KOKORO_MAX_PIPELINES")
+    voice_cache_mb: float = Field(256.0, alias="KOKORO_VOICE_CACHE_MB")
+
+    # Synthesis workers / admission control
+    synth_workers: int = Field(0, alias="KOKORO_WORKERS")                # 0 = min(4, cpu_count)
+    synth_max_queue: int = Field(16, alias="KOKORO_MAX_QUEUE")           # waiting requests before 429
+    synth_queue_timeout: float = Field(30.0, alias="KOKORO_QUEUE_TIMEOUT")  # seconds before 503
+    synth_retry_after: int = Field(1, alias="KOKORO_RETRY_AFTER")        # Retry-After seconds
+
+    # Preload-and-fork serving (python -m app.serve)
+    serve_workers: int = Field(0, alias="SERVE_WORKERS")                 # 0 = cpu_count
+    serve_torch_threads: int = Field(0, alias="SERVE_TORCH_THREADS")     # per worker; 0 = cpu_count // workers
+    serve_memory_log_s: float = Field(60.0, alias="SERVE_MEMORY_LOG_S")  # per-worker RSS/PSS log; 0 = once
+
+    # Micro-batching of forward passes across concurrent requests. Workers block
+    # while their segments are batched, so raise KOKORO_WORKERS along with it.
+    batching_enabled: bool = Field(False, alias="KOKORO_BATCHING")
+    batch_max_size: int = Field(8, alias="KOKORO_BATCH_MAX_SIZE")
+    batch_max_wait_ms: float = Field(5.0, alias="KOKORO_BATCH_MAX_WAIT_MS")
+
+    # Encoded-response cache (memory LRU + optional disk tier)
+    audio_cache_enabled: bool = Field(True, alias="AUDIO_CACHE_ENABLED")
+    audio_cache_mb: float = Field(256.0, alias="AUDIO_CACHE_MB")
+    audio_cache_dir: str = Field("", alias="AUDIO_CACHE_DIR")            # empty = memory only
+    audio_cache_disk_mb: float = Field(2048.0, alias="AUDIO_CACHE_DISK_MB")
+
+    # Sentence-level phoneme (G2P) cache
+    phoneme_cache_enabled: bool = Field(True, alias="PHONEME_CACHE_ENABLED")
+    phoneme_cache_mb: float = Field(32.0, alias="PHONEME_CACHE_MB")
+    phoneme_cache_dir: str = Field("", alias="PHONEME_CACHE_DIR")        # empty = memory only
+    phoneme_cache_disk_mb: float = Field(256.0, alias="PHONEME_CACHE_DISK_MB")
+
+    # Sentence-level audio cache, stitched with a short crossfade
+    segment_cache_enabled: bool = Field(True, alias="SEGMENT_CACHE_ENABLED")
+    segment_cache_mb: float = Field(128.0, alias="SEGMENT_CACHE_MB")
+    segment_crossfade_ms: float = Field(10.0, alias="SEGMENT_CROSSFADE_MS")  # 0 = plain concat
+
+    # Ogg page flush interval for streamed opus; smaller = earlier first bytes
+    stream_ogg_page_ms: float = Field(40.0, alias="STREAM_OGG_PAGE_MS")
 
     # Storage
     save_audio: bool = Field(True, alias="SAVE_AUDIO")
     save_dir: str = Field("app/assets/out", alias="SAVE_DIR")
+    save_queue_size: int = Field(32, alias="SAVE_QUEUE_SIZE")             # pending saves; beyond this they are skipped
+    save_batch_size: int = Field(8, alias="SAVE_BATCH_SIZE")              # files written per writer wakeup
+    save_max_mb: float = Field(1024.0, alias="SAVE_MAX_MB")               # oldest files removed past this
+    save_retention_hours: float = Field(24.0, alias="SAVE_RETENTION_HOURS")  # 0 = keep until SAVE_MAX_MB
 
     # Formats
     allowed_formats: List[str] = Field(
-        default_factory=lambda: ["wav", "mp3", "ogg", "flac"],
+        default_factory=lambda: ["wav", "mp3", "ogg", "flac", "pcm", "opus", "aac", "mulaw", "alaw"],
         alias="ALLOWED_FORMATS",
     )
 
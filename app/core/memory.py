@@ -0,0 +1,33 @@
+# app/core/memory.py
+"""Per-process memory figures from ``/proc``, for sizing pods.
+
+RSS alone double-counts pages shared copy-on-write between forked workers;
+PSS splits each shared page between the processes mapping it, so the PSS of
+all workers adds up to what they really cost together.
+"""
+from typing import Optional, Union
+
+_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_mb",
+    "Shared_Dirty": "shared_mb",
+    "Private_Clean": "private_mb",
+    "Private_Dirty": "private_mb",
+    "Swap": "swap_mb",
+}
+
+
+def process_memory(pid: Union[int, str] = "self") -> Optional[dict]:
+    """``{rss_mb, pss_mb, shared_mb, private_mb, swap_mb}`` for ``pid``, or None off Linux."""
+    out = {name: 0.0 for name in _FIELDS.values()}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                name = _FIELDS.get(key)
+                if name is not None:
+                    out[name] += int(rest.split()[0]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        return None
+    return {k: round(v, 1) for k, v in out.items()}
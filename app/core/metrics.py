@@ -0,0 +1,115 @@
+# app/core/metrics.py
+"""Prometheus metrics, served on ``/metrics``.
+
+Per-request figures are observed once a /v1/audio/speech request has
+produced all of its audio, labeled by ``voice`` (the voice id, or ``blend``
+for multi-voice recipes), ``format`` and ``lang_code``:
+
+- ``tts_queue_wait_seconds``: time spent waiting for a synthesis worker.
+- ``tts_stage_seconds{stage=...}``: per-request totals of the stages in
+  ``app.core.timing`` (see ``timing.STAGES``). A stage that did not run,
+  e.g. thanks to a cache hit or an already built pipeline, is not observed.
+- ``tts_ttfa_seconds``: request start to the first audio bytes; for
+  non-streamed responses that is the whole response.
+- ``tts_rtf``: synthesis worker time divided by the audio duration.
+- ``tts_audio_seconds_total``: audio produced.
+
+Alongside them: ``tts_requests_in_flight``, ``tts_cache_lookups_total``
+(hit rate = hits / all, per cache), ``tts_pipeline_builds_total`` and
+``tts_pipeline_evictions_total`` from the pipeline pool, and
+``tts_save_seconds{result=saved|deduped|error}`` for each file the
+background writer handles.
+
+Under ``python -m app.serve`` each worker has its own counters; set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty directory so that ``/metrics``
+aggregates all workers whichever one answers the scrape.
+"""
+import os
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from app.core import timing
+from app.core.timing import STAGES, Timings
+
+LABELS = ("voice", "format", "lang_code")
+
+_STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+QUEUE_WAIT = Histogram(
+    "tts_queue_wait_seconds", "Time waiting for a synthesis worker", LABELS, buckets=_LATENCY_BUCKETS
+)
+STAGE = Histogram(
+    "tts_stage_seconds", "Per-request time spent in each synthesis stage", LABELS + ("stage",), buckets=_STAGE_BUCKETS
+)
+TTFA = Histogram(
+    "tts_ttfa_seconds", "Request start to first audio bytes", LABELS, buckets=_LATENCY_BUCKETS
+)
+RTF = Histogram(
+    "tts_rtf", "Real-time factor: synthesis worker time / audio duration", LABELS, buckets=_RTF_BUCKETS
+)
+AUDIO_SECONDS = Counter("tts_audio_seconds", "Seconds of audio produced", LABELS)
+IN_FLIGHT = Gauge(
+    "tts_requests_in_flight", "Synthesis requests queued or running", multiprocess_mode="livesum"
+)
+CACHE_LOOKUPS = Counter("tts_cache_lookups", "Cache lookups by cache and result", ("cache", "result"))
+PIPELINE_BUILDS = Counter("tts_pipeline_builds", "KPipeline front-ends built", ("lang_code",))
+PIPELINE_EVICTIONS = Counter("tts_pipeline_evictions", "KPipeline front-ends evicted from the pool")
+SAVE = Histogram(
+    "tts_save_seconds", "Background write of one saved file", ("result",), buckets=_STAGE_BUCKETS
+)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    result = "hit" if hit else "miss"
+    CACHE_LOOKUPS.labels(cache, result).inc()
+    timing.count(f"{cache}_cache_{result}")
+
+
+def observe_request(
+    labels: Tuple[str, str, str],
+    timings: Optional[Timings],
+    wait_ms: float,
+    run_ms: float,
+    ttfa_ms: float,
+    audio_s: float,
+) -> None:
+    """Record one synthesized request; ``labels`` is ``(voice, format, lang_code)``."""
+    QUEUE_WAIT.labels(*labels).observe(wait_ms / 1000.0)
+    TTFA.labels(*labels).observe(ttfa_ms / 1000.0)
+    if timings is not None:
+        for name in STAGES:
+            if name in timings.stages:
+                STAGE.labels(*labels, name).observe(timings.stages[name] / 1000.0)
+    if audio_s > 0:
+        AUDIO_SECONDS.labels(*labels).inc(audio_s)
+        RTF.labels(*labels).observe(run_ms / 1000.0 / audio_s)
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition body and content type for ``/metrics``."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a dead worker's live gauges (multiprocess mode only)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
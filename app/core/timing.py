@@ -0,0 +1,118 @@
+# app/core/timing.py
+"""Per-request stage timings.
+
+The router starts a ``Timings`` for each request; engine code wraps its
+stages in ``stage("name")``. The active ``Timings`` lives in a context var,
+and the synthesis executor copies the context into its worker threads, so
+stages run off the event loop still land on the right request.
+
+``server_timing`` formats the totals as a ``Server-Timing`` header. A
+``Timings`` started with ``trace=True`` also keeps every individual span
+(offset from the request start, duration, thread) for the debug trace;
+``count`` tallies events such as cache hits alongside them.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+# Known stages, in pipeline order. Stages can nest or overlap: ``batch_wait``
+# is part of ``acoustic``, and ``model``/``voice`` loads happen inside a request.
+STAGES = ("pipeline", "model", "voice", "blend", "g2p", "acoustic", "batch_wait", "resample", "encode", "save")
+
+
+class Timings:
+    def __init__(self, trace: bool = False):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.events: Dict[str, int] = {}
+        self.spans: Optional[List[dict]] = [] if trace else None
+
+    def add(self, name: str, ms: float) -> None:
+        end = time.perf_counter()
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + ms
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if self.spans is not None:
+                self.spans.append({
+                    "stage": name,
+                    "start_ms": round((end - self.started) * 1000.0 - ms, 3),
+                    "ms": round(ms, 3),
+                    "thread": threading.current_thread().name,
+                })
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.events[name] = self.events.get(name, 0) + 1
+
+    def get(self, name: str) -> float:
+        return self.stages.get(name, 0.0)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def trace(self) -> dict:
+        """Totals and, if tracing, the individual spans in start order."""
+        with self._lock:
+            out = {
+                "stages": {
+                    name: {"ms": round(ms, 3), "count": self.counts.get(name, 0)}
+                    for name, ms in self.stages.items()
+                },
+                "events": dict(self.events),
+            }
+            if self.spans is not None:
+                out["spans"] = sorted(self.spans, key=lambda s: s["start_ms"])
+        return out
+
+
+_current: ContextVar[Optional[Timings]] = ContextVar("tts_timings", default=None)
+
+
+def start(trace: bool = False) -> Timings:
+    t = Timings(trace)
+    _current.set(t)
+    return t
+
+
+def current() -> Optional[Timings]:
+    return _current.get()
+
+
+def record(name: str, ms: float) -> None:
+    """Add an externally measured duration to the current request, if any."""
+    t = _current.get()
+    if t is not None:
+        t.add(name, ms)
+
+
+def count(name: str) -> None:
+    """Tally an event (e.g. a cache hit) on the current request, if any."""
+    t = _current.get()
+    if t is not None:
+        t.count(name)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - t0) * 1000.0)
+
+
+def server_timing(timings: Optional[Timings], **extra: float) -> str:
+    """``Server-Timing`` value: ``extra`` entries (e.g. queue, total) plus every recorded stage."""
+    entries = dict(extra)
+    if timings is not None:
+        with timings._lock:
+            recorded = dict(timings.stages)
+        for name in STAGES:
+            if name in recorded:
+                entries[name] = recorded.pop(name)
+        entries.update(recorded)
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in entries.items())
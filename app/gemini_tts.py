@@ -1,16 +1,40 @@
 gemini:
   api_key: "YOUR_REAL_GEMINI_API_KEY_HERE"
   model: "gemini-2.5-flash-preview-tts"
+  base_url: "https://generativelanguage.googleapis.com"  # point at mock_server.py for local tests
+  stream: false  # use streamGenerateContent (lower time-to-first-audio)
 
 audio:
   default_voice: "Kore"
   sample_rate: 24000
   output_dir: "outputs"
+  formats: ["wav"]   # any of pcm, wav, mulaw; returned in memory
+  save: false        # also write them to output_dir (off the request path)
+
+cache:
+  enabled: true      # raw L16 per (model, voice, sample_rate, normalized text)
+  dir: "cache"
+  max_mb: 512        # least recently used entries are evicted past this
+
+long_text:
+  max_chars: 600     # synthesize_long packs whole sentences into chunks this size
+  crossfade_ms: 30   # overlap between consecutive chunks when rejoining
+
+http:
+  timeout_s: 60
+  max_connections: 8      # pooled keep-alive connections
+  max_concurrency: 4      # in-flight requests for synthesize_many / synthesize_long
+  rps: 0                  # max request starts per second, retries included (0 = no limit)
+  max_retries: 3          # on 429/5xx and connection errors
+  backoff_base_s: 0.25    # full-jitter exponential backoff
+  backoff_max_s: 8
 
 
 
 import struct
 
+import numpy as np
+
 
 def l16_to_wav(l16_bytes: bytes, sample_rate=24000, num_channels=1):
     bits_per_sample = 16
@@ -61,7 +85,8 @@ def linear2ulaw(sample):
     return ulaw_byte
 
 
-def l16_to_mulaw(l16_bytes):
+def l16_to_mulaw_slow(l16_bytes):
+    """Per-sample reference for ``l16_to_mulaw``; kept for tests and benchmarks."""
     out = bytearray()
     for i in range(0, len(l16_bytes), 2):
         sample = struct.unpack("<h", l16_bytes[i:i+2])[0]
@@ -69,9 +94,39 @@ def l16_to_mulaw(l16_bytes):
     return bytes(out)
 
 
+def _build_ulaw_lut():
+    """``linear2ulaw`` evaluated for every int16, indexed by its uint16 bit pattern."""
+    sample = np.arange(1 << 16, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = (sample >> 8) & 0x80
+    mag = np.minimum(np.abs(sample), 0x1FFF) + 33
+    # Same result as the exponent search loop: position of the top bit above bit 7.
+    exponent = np.searchsorted([0x100, 0x200, 0x400, 0x800, 0x1000, 0x2000, 0x4000], mag, side="right")
+    mantissa = (mag >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+_ULAW_LUT = _build_ulaw_lut()
+
+
+def l16_to_mulaw(l16_bytes):
+    samples = np.frombuffer(l16_bytes, dtype="<i2")
+    return _ULAW_LUT[samples.view("<u2")].tobytes()
+
+
+# Output formats GeminiTTS can return, as raw L16 bytes -> encoded bytes.
+ENCODERS = {
+    "pcm": lambda l16_bytes, sample_rate: l16_bytes,
+    "wav": l16_to_wav,
+    "mulaw": lambda l16_bytes, sample_rate: l16_to_mulaw(l16_bytes),
+}
+
+
 import os
 import re
 import datetime
+import logging
+import queue
+import threading
 
 
 def ensure_dir(path):
@@ -85,12 +140,415 @@ def generate_filename(prefix, voice, text, ext="wav"):
     return f"{prefix}_{voice}_{preview}_{timestamp}.{ext}"
 
 
-import requests
+class BackgroundWriter:
+    """Writes files on a daemon thread so callers never wait on disk."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self.written = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="gemini-tts-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path, data):
+        self._queue.put((path, data))
+
+    def _run(self):
+        while True:
+            path, data = self._queue.get()
+            try:
+                with open(path, "wb") as f:
+                    f.write(data)
+                self.written += 1
+            except OSError:
+                self.failed += 1
+                logging.exception("could not write %s", path)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until everything submitted so far is on disk."""
+        self._queue.join()
+
+
+# tts/transport.py
+"""Pooled HTTP transport for the Gemini API.
+
+One ``httpx.Client`` / ``httpx.AsyncClient`` per GeminiTTS instance keeps
+TLS connections alive between calls. Requests that fail with 429/5xx or a
+transport error are retried with full-jitter exponential backoff, and a
+``Retry-After`` header, when present, is used as the minimum wait. An
+optional ``RateLimiter`` spaces request starts (retries included) to stay
+inside a requests-per-second quota.
+"""
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    def __init__(self, max_retries=3, backoff_base_s=0.25, backoff_max_s=8.0):
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+    def delay(self, attempt, response=None):
+        """Seconds to wait before retry number ``attempt`` (0-based)."""
+        cap = min(self.backoff_max_s, self.backoff_base_s * (2 ** attempt))
+        wait = random.uniform(0, cap)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                wait = max(wait, min(float(retry_after), self.backoff_max_s))
+            except ValueError:
+                pass
+        return wait
+
+
+class RateLimiter:
+    """Spaces request starts ``1 / rps`` seconds apart; ``rps <= 0`` disables it."""
+
+    def __init__(self, rps=0.0):
+        self.interval = 1.0 / rps if rps and rps > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Claim the next slot and return how long to wait for it."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        return slot - now
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def await_slot(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _limits(max_connections):
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+
+
+class Transport:
+    """Blocking transport; safe to share between threads."""
+
+    def __init__(self, timeout_s=60.0, max_connections=8, retry=None, limiter=None):
+        self.retry = retry or RetryPolicy()
+        self.limiter = limiter or RateLimiter()
+        self.client = httpx.Client(timeout=timeout_s, limits=_limits(max_connections))
+        self.retries = 0
+
+    def _request(self, send):
+        attempt = 0
+        while True:
+            response = None
+            try:
+                self.limiter.wait()
+                response = send()
+                if response.status_code not in RETRY_STATUS or attempt >= self.retry.max_retries:
+                    return response
+                response.read()
+                response.close()
+            except httpx.TransportError:
+                if attempt >= self.retry.max_retries:
+                    raise
+            time.sleep(self.retry.delay(attempt, response))
+            attempt += 1
+            self.retries += 1
+
+    def post_json(self, url, payload):
+        return self._request(lambda: self.client.post(url, json=payload))
+
+    def stream_json(self, url, payload):
+        """POST and return the response with its body unread; the caller closes it.
+
+        Only the status line is retried; once bytes are handed out the
+        stream is never replayed.
+        """
+        return self._request(
+            lambda: self.client.send(self.client.build_request("POST", url, json=payload), stream=True)
+        )
+
+    def close(self):
+        self.client.close()
+
+
+class AsyncTransport:
+    """asyncio transport with a semaphore bounding in-flight requests."""
+
+    def __init__(self, timeout_s=60.0, max_connections=8, max_concurrency=8, retry=None, limiter=None):
+        self.retry = retry or RetryPolicy()
+        self.limiter = limiter or RateLimiter()
+        self.client = httpx.AsyncClient(timeout=timeout_s, limits=_limits(max_connections))
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.retries = 0
+
+    async def _request(self, send):
+        attempt = 0
+        while True:
+            response = None
+            try:
+                async with self.semaphore:
+                    await self.limiter.await_slot()
+                    response = await send()
+                if response.status_code not in RETRY_STATUS or attempt >= self.retry.max_retries:
+                    return response
+                await response.aread()
+                await response.aclose()
+            except httpx.TransportError:
+                if attempt >= self.retry.max_retries:
+                    raise
+            # Back off outside the semaphore so waiting retries don't hold a slot.
+            await asyncio.sleep(self.retry.delay(attempt, response))
+            attempt += 1
+            self.retries += 1
+
+    async def post_json(self, url, payload):
+        return await self._request(lambda: self.client.post(url, json=payload))
+
+    async def stream_json(self, url, payload):
+        """Async ``Transport.stream_json``; the semaphore covers the request, not the body."""
+        return await self._request(
+            lambda: self.client.send(self.client.build_request("POST", url, json=payload), stream=True)
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+
+# tts/cache.py
+"""Size-bounded on-disk cache of raw L16 audio.
+
+Entries live at ``<dir>/<key[:2]>/<key>.l16`` and are written atomically
+(temp file + rename), so a crash never leaves a truncated entry behind.
+Reads bump the file's mtime; when the total size passes ``max_bytes`` the
+least recently used files are removed until it is back under 90%. An
+entry larger than ``max_bytes`` is not stored at all.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    return _WS.sub(" ", (text or "").strip())
+
+
+def cache_key(model, voice, sample_rate, text):
+    raw = json.dumps([model, voice, int(sample_rate), normalize_text(text)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+        self._bytes = sum(size for _path, size, _mtime in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.l16")
+
+    def _entries(self):
+        for dirpath, _dirs, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".l16"):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store ``data`` under ``key``; returns False if it is larger than the whole cache."""
+        if len(data) > self.max_bytes:
+            return False
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Replace and account under one lock, so concurrent puts of the
+            # same key each subtract the size they actually overwrote.
+            with self._lock:
+                old = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp, path)
+                self._bytes += len(data) - old
+                over = self._bytes > self.max_bytes
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        if over:
+            self._evict()
+        return True
+
+    def _evict(self):
+        with self._lock:
+            target = int(self.max_bytes * 0.9)
+            for path, size, _mtime in sorted(self._entries(), key=lambda e: e[2]):
+                if self._bytes <= target:
+                    break
+                try:
+                    os.remove(path)
+                    self._bytes -= size
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+
+# tts/long_text.py
+"""Sentence chunking and crossfaded reassembly for long inputs.
+
+``split_sentences`` packs whole sentences into chunks of at most
+``max_chars`` (a sentence longer than that is cut at the last space before
+the limit). ``crossfade_join`` concatenates the chunks' L16 audio in order,
+overlapping each boundary by ``fade_ms`` with a linear ramp so the seams
+don't click.
+"""
+import re
+
+import numpy as np
+
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?…。！？])|(?<=[.!?…。！？][\"')\]]))\s+")
+
+
+def _hard_wrap(sentence, max_chars):
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        yield sentence[:cut].strip()
+        sentence = sentence[cut:].strip()
+    if sentence:
+        yield sentence
+
+
+def split_sentences(text, max_chars=600):
+    sentences = [s.strip() for s in _SENTENCE_END.split(text.strip()) if s.strip()]
+    chunks, current = [], ""
+    for sentence in sentences:
+        for piece in _hard_wrap(sentence, max_chars):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def crossfade_join(parts, sample_rate, fade_ms=30):
+    """Join L16 byte strings in order with a ``fade_ms`` linear crossfade at each seam."""
+    arrays = [np.frombuffer(p, dtype="<i2") for p in parts if p]
+    if not arrays:
+        return b""
+    fade = int(sample_rate * fade_ms / 1000)
+    out = [arrays[0].astype(np.float32)]
+    for nxt in arrays[1:]:
+        prev = out[-1]
+        n = min(fade, prev.size, nxt.size)
+        nxt = nxt.astype(np.float32)
+        if n:
+            ramp = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)
+            nxt[:n] = prev[-n:] * (1.0 - ramp) + nxt[:n] * ramp
+            out[-1] = prev[:-n]
+        out.append(nxt)
+    joined = np.concatenate(out)
+    return np.clip(np.rint(joined), -32768, 32767).astype("<i2").tobytes()
+
+
+
+# tts/gemini_client.py
+import asyncio
 import base64
+import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import yaml
-from .audio_utils import l16_to_wav, l16_to_mulaw
-from .file_utils import ensure_dir, generate_filename
+from .audio_utils import ENCODERS, l16_to_mulaw
+from .cache import AudioCache, cache_key
+from .file_utils import BackgroundWriter, ensure_dir, generate_filename
+from .long_text import crossfade_join, split_sentences
+from .transport import AsyncTransport, RateLimiter, RetryPolicy, Transport
+
+
+def _sse_audio(line):
+    """Raw L16 bytes carried by one ``data:`` line of the SSE stream."""
+    if not line.startswith("data:"):
+        return b""
+    event = json.loads(line[5:])
+    out = b""
+    for candidate in event.get("candidates", []):
+        for part in candidate.get("content", {}).get("parts", []):
+            inline = part.get("inlineData")
+            if inline:
+                out += base64.b64decode(inline["data"])
+    return out
+
+
+class _Frames:
+    """Cuts L16 chunks on sample boundaries and converts them to the output format."""
+
+    def __init__(self, fmt):
+        if fmt not in ("pcm", "mulaw"):
+            raise ValueError(f"unsupported stream format {fmt!r}")
+        self.fmt = fmt
+        self._odd = b""
+
+    def push(self, data):
+        data = self._odd + data
+        cut = len(data) - len(data) % 2
+        self._odd = data[cut:]
+        frame = data[:cut]
+        if frame and self.fmt == "mulaw":
+            frame = l16_to_mulaw(frame)
+        return frame
 
 
 class GeminiTTS:
@@ -100,22 +558,88 @@ class GeminiTTS:
 
         self.api_key = cfg["gemini"]["api_key"]
         self.model = cfg["gemini"]["model"]
+        self.base_url = cfg["gemini"].get("base_url", "https://generativelanguage.googleapis.com")
         self.default_voice = cfg["audio"]["default_voice"]
         self.sample_rate = cfg["audio"]["sample_rate"]
         self.output_dir = cfg["audio"]["output_dir"]
+        self.formats = list(cfg["audio"].get("formats", ["wav"]))
+        self.save = bool(cfg["audio"].get("save", False))
+        self.streaming = bool(cfg["gemini"].get("stream", False))
+        self._check_formats(self.formats)
+
+        http = cfg.get("http", {})
+        self.timeout_s = float(http.get("timeout_s", 60))
+        self.max_connections = int(http.get("max_connections", 8))
+        self.max_concurrency = int(http.get("max_concurrency", 4))
+        self.retry = RetryPolicy(
+            max_retries=int(http.get("max_retries", 3)),
+            backoff_base_s=float(http.get("backoff_base_s", 0.25)),
+            backoff_max_s=float(http.get("backoff_max_s", 8)),
+        )
+        # Shared by both transports so sync and async calls draw on one budget.
+        self.limiter = RateLimiter(float(http.get("rps", 0)))
+
+        long_text = cfg.get("long_text", {})
+        self.max_chunk_chars = int(long_text.get("max_chars", 600))
+        self.crossfade_ms = float(long_text.get("crossfade_ms", 30))
+
+        cache = cfg.get("cache", {})
+        self.cache = (
+            AudioCache(cache.get("dir", "cache"), float(cache.get("max_mb", 512)) * 1024 * 1024)
+            if cache.get("enabled", False)
+            else None
+        )
 
-        ensure_dir(self.output_dir)
+        self._writer = None
 
         self.url = (
-            f"https://generativelanguage.googleapis.com/v1beta/models/"
+            f"{self.base_url.rstrip('/')}/v1beta/models/"
             f"{self.model}:generateContent?key={self.api_key}"
         )
-
-    def synthesize(self, text, voice=None):
-        if voice is None:
-            voice = self.default_voice
-
-        payload = {
+        self.stream_url = (
+            f"{self.base_url.rstrip('/')}/v1beta/models/"
+            f"{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
+        )
+        self.transport = Transport(self.timeout_s, self.max_connections, self.retry, self.limiter)
+        self._async_transport = None
+
+    @property
+    def async_transport(self):
+        # Created on first use so it binds to the caller's event loop.
+        if self._async_transport is None:
+            self._async_transport = AsyncTransport(
+                self.timeout_s, self.max_connections, self.max_concurrency, self.retry, self.limiter
+            )
+        return self._async_transport
+
+    @staticmethod
+    def _check_formats(formats):
+        unknown = [f for f in formats if f not in ENCODERS]
+        if unknown:
+            raise ValueError(f"unsupported formats {unknown}; choose from {sorted(ENCODERS)}")
+
+    @property
+    def writer(self):
+        if self._writer is None:
+            ensure_dir(self.output_dir)
+            self._writer = BackgroundWriter()
+        return self._writer
+
+    def _cache_get(self, text, voice):
+        if self.cache is None:
+            return None
+        return self.cache.get(cache_key(self.model, voice, self.sample_rate, text))
+
+    def _cache_put(self, text, voice, raw_l16):
+        if self.cache is not None and raw_l16:
+            self.cache.put(cache_key(self.model, voice, self.sample_rate, text), raw_l16)
+
+    @staticmethod
+    def _hit_latency(t_start):
+        return {"cache_hit": True, "api_ms": 0.0, "ttfa_ms": round((time.time() - t_start) * 1000, 2)}
+
+    def _payload(self, text, voice):
+        return {
             "contents": [
                 {"role": "user", "parts": [{"text": text}]}
             ],
@@ -129,11 +653,7 @@ class GeminiTTS:
             }
         }
 
-        # ------ Start API latency timer ------
-        t_start = time.time()
-        response = requests.post(self.url, json=payload)
-        t_api = time.time()
-
+    def _decode(self, response, text, voice):
         if response.status_code != 200:
             raise RuntimeError(response.text)
 
@@ -141,37 +661,237 @@ class GeminiTTS:
         inline = data["candidates"][0]["content"]["parts"][0]["inlineData"]
 
         raw_l16 = base64.b64decode(inline["data"])
+        self._cache_put(text, voice, raw_l16)
+        return raw_l16
+
+    def _fetch(self, text, voice):
+        """Raw L16 for one chunk, from the cache or a blocking request."""
+        raw_l16 = self._cache_get(text, voice)
+        if raw_l16 is None:
+            raw_l16 = self._decode(self.transport.post_json(self.url, self._payload(text, voice)), text, voice)
+        return raw_l16
+
+    def _finish(self, response, text, voice, formats, save, t_start, t_api):
+        raw_l16 = self._decode(response, text, voice)
+        latency = {
+            "cache_hit": False,
+            "api_ms": round((t_api - t_start) * 1000, 2),
+            # Without streaming, no audio is usable before the whole body is decoded.
+            "ttfa_ms": round((time.time() - t_start) * 1000, 2),
+        }
+        return self._package(raw_l16, text, voice, formats, save, t_start, latency)
+
+    def _package(self, raw_l16, text, voice, formats, save, t_start, latency):
+        """Encode ``raw_l16`` into each requested format, in memory.
+
+        With ``save`` the buffers are also handed to the background writer;
+        the returned paths are where they will land.
+        """
+        formats = self.formats if formats is None else list(formats)
+        self._check_formats(formats)
+        save = self.save if save is None else save
+
+        audio, paths = {}, {}
+        for fmt in formats:
+            t0 = time.time()
+            audio[fmt] = ENCODERS[fmt](raw_l16, self.sample_rate)
+            latency[f"{fmt}_encode_ms"] = round((time.time() - t0) * 1000, 2)
+            if save:
+                ext = "raw" if fmt == "pcm" else fmt
+                paths[fmt] = f"{self.output_dir}/{generate_filename(f'tts_{fmt}', voice, text, ext)}"
+                self.writer.submit(paths[fmt], audio[fmt])
+
+        latency["total_ms"] = round((time.time() - t_start) * 1000, 2)
+        return {"audio": audio, "paths": paths, "latency": latency}
+
+    def synthesize(self, text, voice=None, formats=None, save=None):
+        """Returns ``{"audio": {fmt: bytes}, "paths": {fmt: path}, "latency": {...}}``.
+
+        ``formats`` (any of pcm, wav, mulaw) defaults to ``audio.formats`` and
+        ``save`` to ``audio.save``; nothing touches the disk unless ``save`` is set.
+        Repeated prompts are served from the response cache without network I/O.
+        """
+        if voice is None:
+            voice = self.default_voice
+
+        # ------ Start API latency timer ------
+        t_start = time.time()
+        raw_l16 = self._cache_get(text, voice)
+        if raw_l16 is not None:
+            return self._package(raw_l16, text, voice, formats, save, t_start, self._hit_latency(t_start))
+        response = self.transport.post_json(self.url, self._payload(text, voice))
+        t_api = time.time()
+
+        return self._finish(response, text, voice, formats, save, t_start, t_api)
 
-        # ------ WAV ------
-        t_wav_start = time.time()
-        wav_bytes = l16_to_wav(raw_l16, self.sample_rate)
-        t_wav_end = time.time()
+    async def asynthesize(self, text, voice=None, formats=None, save=None):
+        if voice is None:
+            voice = self.default_voice
 
-        wav_path = f"{self.output_dir}/{generate_filename('tts_wav', voice, text, 'wav')}"
-        with open(wav_path, "wb") as f:
-            f.write(wav_bytes)
+        t_start = time.time()
+        raw_l16 = self._cache_get(text, voice)
+        if raw_l16 is not None:
+            return self._package(raw_l16, text, voice, formats, save, t_start, self._hit_latency(t_start))
+        response = await self.async_transport.post_json(self.url, self._payload(text, voice))
+        t_api = time.time()
 
-        # ------ MULAW ------
-        t_mulaw_start = time.time()
-        mulaw_bytes = l16_to_mulaw(raw_l16)
-        t_mulaw_end = time.time()
+        return self._finish(response, text, voice, formats, save, t_start, t_api)
 
-        mulaw_path = f"{self.output_dir}/{generate_filename('tts_mulaw', voice, text, 'mulaw')}"
-        with open(mulaw_path, "wb") as f:
-            f.write(mulaw_bytes)
+    def stream(self, text, voice=None, fmt="pcm", latency=None):
+        """Yield audio frames as ``streamGenerateContent`` delivers them.
 
-        t_end = time.time()
+        ``fmt`` is ``"pcm"`` (raw L16) or ``"mulaw"``. If ``latency`` is a dict
+        it receives ``ttfa_ms`` at the first frame, then ``api_ms`` and
+        ``chunks`` when the stream ends. A cached prompt is yielded as one
+        frame; a completed stream is added to the cache.
+        """
+        if voice is None:
+            voice = self.default_voice
+        frames = _Frames(fmt)
 
-        return {
-            "wav_path": wav_path,
-            "mulaw_path": mulaw_path,
-            "latency": {
-                "api_ms": round((t_api - t_start) * 1000, 2),
-                "wav_encode_ms": round((t_wav_end - t_wav_start) * 1000, 2),
-                "mulaw_encode_ms": round((t_mulaw_end - t_mulaw_start) * 1000, 2),
-                "total_ms": round((t_end - t_start) * 1000, 2),
-            }
-        }
+        t_start = time.time()
+        cached = self._cache_get(text, voice)
+        if cached is not None:
+            if latency is not None:
+                latency.update(self._hit_latency(t_start), chunks=1)
+            yield frames.push(cached)
+            return
+
+        response = self.transport.stream_json(self.stream_url, self._payload(text, voice))
+        chunks, raw = 0, []
+        try:
+            if response.status_code != 200:
+                response.read()
+                raise RuntimeError(response.text)
+            for line in response.iter_lines():
+                data = _sse_audio(line)
+                raw.append(data)
+                frame = frames.push(data)
+                if not frame:
+                    continue
+                chunks += 1
+                if chunks == 1 and latency is not None:
+                    latency["ttfa_ms"] = round((time.time() - t_start) * 1000, 2)
+                yield frame
+        finally:
+            response.close()
+        self._cache_put(text, voice, b"".join(raw))
+        if latency is not None:
+            latency["cache_hit"] = False
+            latency["api_ms"] = round((time.time() - t_start) * 1000, 2)
+            latency["chunks"] = chunks
+
+    async def astream(self, text, voice=None, fmt="pcm", latency=None):
+        """asyncio variant of ``stream``."""
+        if voice is None:
+            voice = self.default_voice
+        frames = _Frames(fmt)
+
+        t_start = time.time()
+        cached = self._cache_get(text, voice)
+        if cached is not None:
+            if latency is not None:
+                latency.update(self._hit_latency(t_start), chunks=1)
+            yield frames.push(cached)
+            return
+
+        response = await self.async_transport.stream_json(self.stream_url, self._payload(text, voice))
+        chunks, raw = 0, []
+        try:
+            if response.status_code != 200:
+                await response.aread()
+                raise RuntimeError(response.text)
+            async for line in response.aiter_lines():
+                data = _sse_audio(line)
+                raw.append(data)
+                frame = frames.push(data)
+                if not frame:
+                    continue
+                chunks += 1
+                if chunks == 1 and latency is not None:
+                    latency["ttfa_ms"] = round((time.time() - t_start) * 1000, 2)
+                yield frame
+        finally:
+            await response.aclose()
+        self._cache_put(text, voice, b"".join(raw))
+        if latency is not None:
+            latency["cache_hit"] = False
+            latency["api_ms"] = round((time.time() - t_start) * 1000, 2)
+            latency["chunks"] = chunks
+
+    def synthesize_streaming(self, text, voice=None, formats=None, save=None):
+        """``synthesize`` over the streaming endpoint; ``ttfa_ms`` is the first SSE frame."""
+        if voice is None:
+            voice = self.default_voice
+
+        latency = {}
+        t_start = time.time()
+        raw_l16 = b"".join(self.stream(text, voice, "pcm", latency))
+        return self._package(raw_l16, text, voice, formats, save, t_start, {
+            "cache_hit": latency["cache_hit"],
+            "api_ms": latency["api_ms"],
+            "ttfa_ms": latency.get("ttfa_ms"),
+        })
+
+    def synthesize_long(self, text, voice=None, formats=None, save=None, max_chars=None, crossfade_ms=None):
+        """``synthesize`` for long inputs: sentence chunks in parallel, joined in order.
+
+        The text is split into chunks of at most ``long_text.max_chars``,
+        which are requested concurrently (``http.max_concurrency`` at a time,
+        started no faster than ``http.rps``) and reassembled with a
+        ``long_text.crossfade_ms`` crossfade. Each chunk is cached on its own.
+        """
+        if voice is None:
+            voice = self.default_voice
+        chunks = split_sentences(text, max_chars or self.max_chunk_chars)
+        if len(chunks) <= 1:
+            return self.synthesize(text, voice, formats, save)
+
+        def fetch(chunk):
+            t0 = time.time()
+            raw = self._fetch(chunk, voice)
+            return raw, (time.time() - t0) * 1000
+
+        t_start = time.time()
+        workers = max(1, min(self.max_concurrency, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-tts") as pool:
+            results = list(pool.map(fetch, chunks))
+        t_api = time.time()
+
+        fade = self.crossfade_ms if crossfade_ms is None else crossfade_ms
+        raw_l16 = crossfade_join([raw for raw, _ms in results], self.sample_rate, fade)
+        return self._package(raw_l16, text, voice, formats, save, t_start, {
+            "chunks": len(chunks),
+            "api_ms": round((t_api - t_start) * 1000, 2),
+            "slowest_chunk_ms": round(max(ms for _raw, ms in results), 2),
+            "join_ms": round((time.time() - t_api) * 1000, 2),
+            "ttfa_ms": round((time.time() - t_start) * 1000, 2),
+        })
+
+    def synthesize_many(self, texts, voice=None, max_concurrency=None, formats=None, save=None):
+        """Synthesize ``texts`` concurrently over the shared pool; results keep input order."""
+        workers = max(1, min(max_concurrency or self.max_concurrency, len(texts) or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-tts") as pool:
+            return list(pool.map(lambda t: self.synthesize(t, voice, formats, save), texts))
+
+    async def asynthesize_many(self, texts, voice=None, formats=None, save=None):
+        """asyncio variant of ``synthesize_many``; concurrency is bounded by ``http.max_concurrency``."""
+        return await asyncio.gather(*(self.asynthesize(t, voice, formats, save) for t in texts))
+
+    def flush(self):
+        """Wait for pending background writes."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self):
+        self.flush()
+        self.transport.close()
+
+    async def aclose(self):
+        self.close()
+        if self._async_transport is not None:
+            await self._async_transport.aclose()
+            self._async_transport = None
 
 
 
@@ -186,27 +906,384 @@ if __name__ == "__main__":
     while True:
         text = input("Enter text: ").strip()
         if text.lower() == "exit":
+            client.close()
             break
 
         voice = input("Choose voice (default Kore): ").strip()
         if voice == "":
             voice = None
 
-        result = client.synthesize(text, voice)
+        # The interactive tool keeps both files for listening back.
+        if client.streaming:
+            result = client.synthesize_streaming(text, voice, formats=["wav", "mulaw"], save=True)
+        else:
+            # Long inputs are split at sentences and synthesized in parallel.
+            result = client.synthesize_long(text, voice, formats=["wav", "mulaw"], save=True)
 
         print("\n======= LATENCY REPORT =======")
         for k, v in result["latency"].items():
-            print(f"{k}: {v} ms")
+            print(f"{k}: {v} ms" if k.endswith("_ms") else f"{k}: {v}")
 
         print("\nSaved:")
-        print("WAV   →", result["wav_path"])
-        print("MULAW →", result["mulaw_path"])
+        print("WAV   →", result["paths"]["wav"])
+        print("MULAW →", result["paths"]["mulaw"])
         print("==============================\n")
 
 
 
-requests
+# bench_mulaw.py
+"""Compare the per-sample and lookup-table PCM -> mu-law paths on 1-60 s clips.
+
+    python bench_mulaw.py
+"""
+import time
+
+import numpy as np
+
+from tts.audio_utils import l16_to_mulaw, l16_to_mulaw_slow
+
+SAMPLE_RATE = 24000
+
+
+def best_ms(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    every_sample = np.arange(-32768, 32768, dtype="<i2").tobytes()
+    assert l16_to_mulaw(every_sample) == l16_to_mulaw_slow(every_sample), "LUT output differs"
+
+    rng = np.random.default_rng(0)
+    print(f"{'clip':>6} {'loop ms':>10} {'lut ms':>9} {'speedup':>9}")
+    for seconds in (1, 5, 15, 30, 60):
+        pcm = (rng.standard_normal(SAMPLE_RATE * seconds) * 6000).clip(-32768, 32767).astype("<i2").tobytes()
+        assert l16_to_mulaw(pcm) == l16_to_mulaw_slow(pcm)
+        slow = best_ms(l16_to_mulaw_slow, pcm, 1)
+        fast = best_ms(l16_to_mulaw, pcm, 20)
+        print(f"{seconds:>5}s {slow:10.1f} {fast:9.3f} {slow / fast:8.0f}x")
+
+
+
+# mock_server.py
+"""Local stand-in for the Gemini ``generateContent`` TTS endpoint.
+
+Returns a sine tone as base64 L16 PCM, 60 ms per character of input, after
+an artificial latency, and can fail a share of requests with 429/503 to
+exercise retries. ``streamGenerateContent?alt=sse`` sends the same tone as
+server-sent events of ``--chunk-ms`` audio each: the first one after a third
+of the latency, the rest spread over the remainder, the way the real API
+front-loads its first chunk. ``--ms-per-char`` adds latency proportional to
+the input length, as a real model has. Point ``gemini.base_url`` at it:
+
+    python mock_server.py --port 8765 --latency-ms 300 --fail-rate 0.1
+"""
+import argparse
+import base64
+import json
+import math
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_RATE = 24000
+
+
+def tone_l16(seconds, freq=220.0):
+    n = int(SAMPLE_RATE * seconds)
+    return struct.pack(
+        f"<{n}h", *(int(8000 * math.sin(2 * math.pi * freq * i / SAMPLE_RATE)) for i in range(n))
+    )
+
+
+def _audio_response(pcm):
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{
+                "inlineData": {
+                    "mimeType": f"audio/L16;codec=pcm;rate={SAMPLE_RATE}",
+                    "data": base64.b64encode(pcm).decode(),
+                }
+            }]}
+        }]
+    }
+
+
+class MockGemini(BaseHTTPRequestHandler):
+    latency_s = 0.3
+    fail_rate = 0.0
+    chunk_s = 0.5
+    s_per_char = 0.0
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        streaming = ":streamGenerateContent" in self.path
+        if not streaming and ":generateContent" not in self.path:
+            return self._send(404, {"error": {"code": 404, "message": "not found"}})
+
+        text = req["contents"][0]["parts"][0]["text"]
+        latency_s = self.latency_s + self.s_per_char * len(text)
+        time.sleep(latency_s / 3 if streaming else latency_s)
+        if random.random() < self.fail_rate:
+            status = random.choice([429, 503])
+            return self._send(status, {"error": {"code": status, "message": "mock failure"}}, {"Retry-After": "0"})
+
+        pcm = tone_l16(0.06 * max(1, len(text)))
+        if not streaming:
+            return self._send(200, _audio_response(pcm))
+
+        step = int(SAMPLE_RATE * self.chunk_s) * 2
+        parts = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, part in enumerate(parts):
+            if i:
+                time.sleep(latency_s * 2 / 3 / max(1, len(parts) - 1))
+            self._chunk(f"data: {json.dumps(_audio_response(part))}\r\n\r\n".encode())
+        self._chunk(b"")
+
+
+def serve_in_thread(port=0, latency_ms=300, fail_rate=0.0, chunk_ms=500, ms_per_char=0.0):
+    """Start the mock on a daemon thread; returns ``(server, base_url)``."""
+    handler = type("Handler", (MockGemini,), {
+        "latency_s": latency_ms / 1000.0, "fail_rate": fail_rate, "chunk_s": chunk_ms / 1000.0,
+        "s_per_char": ms_per_char / 1000.0,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--chunk-ms", type=float, default=500)
+    ap.add_argument("--ms-per-char", type=float, default=0.0)
+    args = ap.parse_args()
+    server, url = serve_in_thread(args.port, args.latency_ms, args.fail_rate, args.chunk_ms, args.ms_per_char)
+    print(f"mock Gemini TTS on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+
+# bench_many.py
+"""Serial one-connection-per-call baseline vs pooled synthesize_many, against mock_server.
+
+    python bench_many.py --n 16 --latency-ms 300 --fail-rate 0.1
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+import yaml
+
+from mock_server import serve_in_thread
+from tts.gemini_client import GeminiTTS
+
+
+def make_config(base_url, out_dir, concurrency):
+    path = os.path.join(out_dir, "config.yaml")
+    with open(path, "w") as f:
+        yaml.safe_dump({
+            "gemini": {"api_key": "test", "model": "mock-tts", "base_url": base_url},
+            "audio": {"default_voice": "Kore", "sample_rate": 24000, "output_dir": out_dir},
+            "http": {"max_concurrency": concurrency, "max_connections": concurrency, "backoff_base_s": 0.05},
+        }, f)
+    return path
+
+
+def baseline(client, texts):
+    # What synthesize used to do: a fresh connection per call, no retries.
+    failures = 0
+    for text in texts:
+        r = httpx.post(client.url, json=client._payload(text, client.default_voice), timeout=60)
+        failures += r.status_code != 200
+    return failures
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=16)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--fail-rate", type=float, default=0.1)
+    args = ap.parse_args()
+
+    server, url = serve_in_thread(latency_ms=args.latency_ms, fail_rate=args.fail_rate)
+    texts = [f"Sentence number {i} for the batch test." for i in range(args.n)]
+    with tempfile.TemporaryDirectory() as out_dir:
+        client = GeminiTTS(make_config(url, out_dir, args.concurrency))
+
+        t0 = time.perf_counter()
+        failed = baseline(client, texts)
+        print(f"serial, no pool:      {time.perf_counter() - t0:6.2f}s  ({failed} failed)")
+
+        t0 = time.perf_counter()
+        client.synthesize_many(texts)
+        print(f"synthesize_many:      {time.perf_counter() - t0:6.2f}s  ({client.transport.retries} retries)")
+
+        async def run_async():
+            await client.asynthesize_many(texts)
+            retries = client.async_transport.retries
+            await client.aclose()
+            return retries
+
+        t0 = time.perf_counter()
+        retries = asyncio.run(run_async())
+        print(f"asynthesize_many:     {time.perf_counter() - t0:6.2f}s  ({retries} retries)")
+    server.shutdown()
+
+
+
+# bench_stream.py
+"""Time-to-first-audio: generateContent vs streamGenerateContent, against mock_server.
+
+    python bench_stream.py --latency-ms 1200 --n 5
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+
+from bench_many import make_config
+from mock_server import serve_in_thread
+from tts.audio_utils import l16_to_mulaw
+from tts.gemini_client import GeminiTTS
+
+TEXT = "Streaming lets the caller start playback long before the full utterance has been generated."
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5)
+    ap.add_argument("--latency-ms", type=float, default=1200)
+    ap.add_argument("--chunk-ms", type=float, default=500)
+    args = ap.parse_args()
+
+    server, url = serve_in_thread(latency_ms=args.latency_ms, chunk_ms=args.chunk_ms)
+    with tempfile.TemporaryDirectory() as out_dir:
+        client = GeminiTTS(make_config(url, out_dir, 4))
+
+        blocking = [client.synthesize(TEXT)["latency"] for _ in range(args.n)]
+        streamed = [client.synthesize_streaming(TEXT)["latency"] for _ in range(args.n)]
+        for name, runs in (("generateContent", blocking), ("streamGenerateContent", streamed)):
+            ttfa = statistics.median(r["ttfa_ms"] for r in runs)
+            total = statistics.median(r["total_ms"] for r in runs)
+            print(f"{name:22} ttfa {ttfa:8.1f} ms   total {total:8.1f} ms")
+
+        # The frame generators must reassemble to exactly what the blocking call returns.
+        pcm = b"".join(client.stream(TEXT))
+        assert b"".join(client.stream(TEXT, fmt="mulaw")) == l16_to_mulaw(pcm)
+
+        async def first_async_frame():
+            latency = {}
+            async for _ in client.astream(TEXT, latency=latency):
+                pass
+            await client.aclose()
+            return latency
+
+        print("astream:", asyncio.run(first_async_frame()))
+    server.shutdown()
+
+
+
+# bench_long.py
+"""One request for a long text vs synthesize_long (sentence chunks in parallel), against mock_server.
+
+    python bench_long.py --sentences 24 --ms-per-char 2 --concurrency 4 --rps 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import yaml
+
+from bench_many import make_config
+from mock_server import serve_in_thread
+from tts.gemini_client import GeminiTTS
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sentences", type=int, default=24)
+    ap.add_argument("--max-chars", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--rps", type=float, default=0)
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--ms-per-char", type=float, default=2)
+    args = ap.parse_args()
+
+    server, url = serve_in_thread(latency_ms=args.latency_ms, ms_per_char=args.ms_per_char)
+    text = " ".join(
+        f"This is sentence number {i}, which the benchmark uses to pad out a long input." for i in range(args.sentences)
+    )
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = make_config(url, out_dir, args.concurrency)
+        with open(path) as f:
+            cfg = yaml.safe_load(f)
+        cfg["http"]["rps"] = args.rps
+        cfg["long_text"] = {"max_chars": args.max_chars, "crossfade_ms": 30}
+        with open(path, "w") as f:
+            yaml.safe_dump(cfg, f)
+        client = GeminiTTS(path)
+
+        t0 = time.perf_counter()
+        single = client.synthesize(text, formats=["pcm"])
+        baseline_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        chunked = client.synthesize_long(text, formats=["pcm"])
+        long_ms = (time.perf_counter() - t0) * 1000
+        client.close()
+
+    lat = chunked["latency"]
+    seconds = len(chunked["audio"]["pcm"]) / 2 / client.sample_rate
+    print(f"{len(text)} chars, {lat['chunks']} chunks of <= {args.max_chars}, "
+          f"concurrency {args.concurrency}, rps {args.rps or 'unlimited'}")
+    print(f"single request:   {baseline_ms:8.1f} ms  ({len(single['audio']['pcm']) / 2 / client.sample_rate:.1f}s audio)")
+    print(f"synthesize_long:  {long_ms:8.1f} ms  ({seconds:.1f}s audio, slowest chunk "
+          f"{lat['slowest_chunk_ms']} ms, join {lat['join_ms']} ms)")
+    print(f"speedup:          {baseline_ms / long_ms:8.2f}x")
+    server.shutdown()
+
+httpx
 pyyaml
+numpy
 
 
 # syntax=docker/dockerfile:1.4
@@ -243,8 +1320,9 @@ import numpy as np
 import yaml
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, Response
 import uvicorn
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 import soundfile as sf
 from pydub import AudioSegment
 
@@ -264,6 +1342,17 @@ SR = CONFIG["sample_rate"]
 app = FastAPI()
 pipeline = None
 
+# Prometheus metrics (GET /metrics)
+LABELS = ("voice", "format", "lang_code")
+TTFA = Histogram("tts_ttfa_seconds", "Request received to first audio segment", LABELS,
+                 buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+RTF = Histogram("tts_rtf", "Synthesis time / audio duration", LABELS,
+                buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0))
+STAGE = Histogram("tts_stage_seconds", "Per-request time in each stage", LABELS + ("stage",),
+                  buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+AUDIO_SECONDS = Counter("tts_audio_seconds", "Seconds of audio produced", LABELS)
+IN_FLIGHT = Gauge("tts_requests_in_flight", "Requests being synthesized")
+
 # Chunking config
 CHUNK_ENABLED = CONFIG.get("chunking", {}).get("enabled", True)
 WORD_THRESHOLD = int(CONFIG.get("chunking", {}).get("word_threshold", 20))
@@ -326,17 +1415,20 @@ def root():
         "Formats: f32 | s16 | wav | mp3 | ogg | flac\n"
     )
 
+@app.get("/metrics")
+def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.websocket("/ws")
 async def ws(websocket: WebSocket):
     await websocket.accept()
     logging.info("connection opened")
+    busy = False
 
     try:
         while True:
-            start = time.time()
-            print(f"----------START TIME: {start}------------")
-
             req = await websocket.receive_text()
+            start = time.perf_counter()
             cfg = json.loads(req)
 
             text = str(cfg.get("text", "")).strip()
@@ -355,12 +1447,13 @@ async def ws(websocket: WebSocket):
                 "sample_format": fmt
             }))
 
+            labels = (voice, fmt, CONFIG["lang_code"])
+            IN_FLIGHT.inc()
+            busy = True
             if CHUNK_ENABLED:
                 chunks = chunk_text(text, WORD_THRESHOLD)
             else:
                 chunks = [text]
-            only_pipeline_start = time.time()
-            print(f"----------ONLY PIPELINE START TIME: {only_pipeline_start}------------")
 
             t0 = time.perf_counter()
             ttfa_sent = False
@@ -383,6 +1476,7 @@ async def ws(websocket: WebSocket):
                         await websocket.send_text(json.dumps(
                             {"type": "ttfa", "ms": (now - t0) * 1000.0}
                         ))
+                        TTFA.labels(*labels).observe(now - start)
                         ttfa_sent = True
 
                     a = as_numpy(audio)
@@ -396,9 +1490,13 @@ async def ws(websocket: WebSocket):
                         pcm16 = (np.clip(a, -1, 1) * 32767.0).astype(np.int16)
                         await websocket.send_bytes(pcm16.tobytes())
 
-            print(f"---------------ONLY PIPELINE Time taken: {time.time() - only_pipeline_start} seconds-----------")
             total_ms = (time.perf_counter() - t0) * 1000.0
             rtf = (total_ms / 1000.0) / max(1e-6, audio_total_s)
+            STAGE.labels(*labels, "synthesis").observe(total_ms / 1000.0)
+            if audio_total_s > 0:
+                RTF.labels(*labels).observe(rtf)
+                AUDIO_SECONDS.labels(*labels).inc(audio_total_s)
+            enc0 = time.perf_counter()
             if fmt in {"wav", "mp3", "ogg", "flac"}:
                 full_audio = np.concatenate(buf) if len(buf) > 1 else buf[0]
 
@@ -416,7 +1514,10 @@ async def ws(websocket: WebSocket):
                     out_io = BytesIO()
                     audio_seg.export(out_io, format=fmt)
                     await websocket.send_bytes(out_io.getvalue())
-                  
+                STAGE.labels(*labels, "encode").observe(time.perf_counter() - enc0)
+            IN_FLIGHT.dec()
+            busy = False
+
             await websocket.send_text(json.dumps({
                 "type": "done",
                 "total_ms": total_ms,
@@ -426,8 +1527,6 @@ async def ws(websocket: WebSocket):
                 "error": None
             }))
 
-            print(f"---------------Time taken: {time.time() - start} seconds-----------")
-
     except WebSocketDisconnect:
         logging.warning("Client disconnected.")
     except Exception as e:
@@ -439,6 +1538,8 @@ async def ws(websocket: WebSocket):
         await websocket.close()
 
     finally:
+        if busy:
+            IN_FLIGHT.dec()
         logging.info("connection closed")
 
 if __name__ == "__main__":
@@ -1,10 +1,24 @@
+from app.core import boot, metrics
+from app.core.memory import process_memory
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.routers.openai_compatible import router as openai_router
-from kokoro import KPipeline
+from app.tts.audio_cache import audio_cache
+from app.tts.batching import batch_scheduler
+from app.tts.encoders import encoder_stats
+from app.tts.executor import executor
+from app.tts.persist import audio_persister
+from app.tts.phoneme_cache import phoneme_cache
+from app.tts.segment_cache import segment_cache
+from app.tts.pipeline_pool import pipeline_pool
+from app.tts.warmup import warmup
+import asyncio
 import os
 
+boot.mark("imported")
+
 app = FastAPI(title=settings.app_name, debug=settings.debug)
 
 if settings.cors_enabled:
@@ -20,22 +34,61 @@ app.include_router(openai_router)
 
 
 @app.on_event("startup")
-async def preload_kokoro_voices():
-    """Automatically preload Kokoro voices on startup (first run)."""
-    voices = os.getenv("KOKORO_PRELOAD_VOICES", "").split()
-    if not voices:
-        print("No KOKORO_PRELOAD_VOICES defined, skipping preload.")
+async def start_warmup():
+    """Warm the real engine in the background; /readyz reports when it is done."""
+    boot.mark("startup")
+    if not settings.warmup_enabled:
+        warmup.state = "ready"
+        _report_ready()
         return
-    pipe = KPipeline(lang_code=settings.lang_code)
-    print(f"Preloading Kokoro voices: {voices}")
-    for v in voices:
-        try:
-            list(pipe("hello world", voice=v))
-            print(f" Cached voice: {v}")
-        except Exception as e:
-            print(f"Failed to preload {v}: {e}")
+    # Runs on a synthesis worker so it holds a slot like any other job.
+    app.state.warmup_task = asyncio.create_task(executor.run(warmup.run))
+    app.state.warmup_task.add_done_callback(lambda _task: _report_ready())
+
+
+def _report_ready() -> None:
+    boot.mark("ready" if warmup.ready else "warmup_failed")
+    marks = ", ".join(f"{k}={v:.0f}" for k, v in boot.report().items())
+    print(f"Boot ({warmup.state}), ms since process start: {marks}")
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    executor.shutdown()
+    audio_persister.close()
 
 
 @app.get("/healthz")
 def healthz():
-    return {"ok": True, "lang": settings.lang_code, "voice": settings.default_voice}
+    return {
+        "ok": True,
+        "lang": settings.lang_code,
+        "voice": settings.default_voice,
+        "executor": executor.stats(),
+        "pipelines": pipeline_pool.stats(),
+        "audio_cache": audio_cache.stats() if audio_cache is not None else None,
+        "phoneme_cache": phoneme_cache.stats() if phoneme_cache is not None else None,
+        "segment_cache": segment_cache.stats() if segment_cache is not None else None,
+        "batching": batch_scheduler.stats() if batch_scheduler is not None else None,
+        "encoders": encoder_stats.stats(),
+        "persist": audio_persister.stats(),
+        "warmup": warmup.stats(),
+        "boot": boot.report(),
+        "pid": os.getpid(),
+        "memory": process_memory(),
+    }
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    body, ctype = metrics.render()
+    return Response(content=body, media_type=ctype)
+
+
+@app.get("/readyz")
+def readyz():
+    stats = warmup.stats()
+    return JSONResponse(
+        {"ready": warmup.ready, **stats, "boot": boot.report()},
+        status_code=200 if warmup.ready else 503,
+    )
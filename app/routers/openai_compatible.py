@@ -1,66 +1,345 @@
 # app/routers/openai_compatible.py
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response, StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import AsyncIterator, Iterator, List, Optional
+import time
 
+import numpy as np
+
+from app.core import metrics, timing
 from app.core.config import settings
-from app.tts.kokoro_engine import synthesize_np, encode_audio, maybe_save
+from app.tts.audio_cache import audio_cache, speech_key
+from app.tts.encoders import G711_FORMATS, OPUS_SAMPLE_RATES, format_available
+from app.tts.g711 import SAMPLE_RATE as G711_SAMPLE_RATE
+from app.tts.executor import SynthesisRejected, executor
+from app.tts.kokoro_engine import synthesize_np, synthesize_iter, encode_audio, maybe_save
+from app.tts.pipeline_pool import LANG_CODES, normalize_lang_code
+from app.tts.streaming import CACHEABLE_STREAM_FORMATS, finalize_wav_header, stream_audio
+from app.tts.voices import parse_recipe
 
 router = APIRouter(prefix="/v1")
 
 class AudioSpeechIn(BaseModel):
     model: str = Field("tts-1", description="Ignored; kept for compatibility")
-    voice: Optional[str] = Field(None, description="Kokoro voice id (e.g., af_heart or af_sky+af_bella)")
+    voice: Optional[str] = Field(
+        None, description="Kokoro voice id or recipe (e.g., af_heart, af_sky+af_bella, af_sky*0.7+af_bella*0.3)"
+    )
     input: str = Field(..., description="Text to synthesize")
-    response_format: Optional[str] = Field("wav", description="wav|mp3|ogg|flac")
+    response_format: Optional[str] = Field("wav", description="wav|mp3|ogg|flac|pcm|opus|aac|mulaw|alaw (pcm = raw s16le mono; mulaw/alaw = raw 8 kHz G.711)")
     speed: Optional[float] = Field(None, description="1.0 = normal")
-    stream: Optional[bool] = Field(False, description="If true, returns chunked bytes")
+    stream: Optional[bool] = Field(False, description="If true, streams audio as each segment is rendered")
     lang_code: Optional[str] = Field(None, description="Kokoro language code (default from server)")
-    sample_rate: Optional[int] = Field(None, description="Default from server")
+    sample_rate: Optional[int] = Field(
+        None, description="Output rate in Hz, 8000-48000 (default from server); resampled from 24 kHz"
+    )
     save: Optional[bool] = Field(None, description="Override server save_audio")
+    debug_timing: Optional[bool] = Field(
+        False, description="If true, synthesize as usual but return a JSON timing trace instead of the audio"
+    )
 
 @router.post("/audio/speech")
-async def audio_speech(body: AudioSpeechIn):
+async def audio_speech(body: AudioSpeechIn, request: Request):
     fmt = (body.response_format or "wav").lower()
     if fmt not in settings.allowed_formats and fmt != "wav":
         raise HTTPException(status_code=400, detail=f"Unsupported response_format='{fmt}'")
+    if not format_available(fmt):
+        raise HTTPException(status_code=400, detail=f"response_format='{fmt}' needs ffmpeg, which is not installed")
 
     text = (body.input or "").strip()
     if not text:
         raise HTTPException(status_code=400, detail="Empty 'input'")
 
     try:
-        audio, sr = synthesize_np(
-            text=text,
-            voice=body.voice,
-            speed=body.speed if body.speed is not None else settings.default_speed,
-            lang_code=body.lang_code or settings.lang_code,
-            sample_rate=body.sample_rate or settings.default_sample_rate,
+        parse_recipe(body.voice)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid voice: {e}")
+
+    speed = body.speed if body.speed is not None else settings.default_speed
+    lang_code = body.lang_code or settings.lang_code
+    lang = normalize_lang_code(lang_code)
+    if lang not in LANG_CODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported lang_code='{lang_code}'")
+    sample_rate = body.sample_rate or settings.default_sample_rate
+    if fmt in G711_FORMATS:
+        if body.sample_rate not in (None, G711_SAMPLE_RATE):
+            raise HTTPException(status_code=400, detail=f"{fmt} is always {G711_SAMPLE_RATE} Hz")
+        sample_rate = G711_SAMPLE_RATE
+    save = body.save if body.save is not None else settings.save_audio
+    if not 8000 <= sample_rate <= 48000:
+        raise HTTPException(status_code=400, detail=f"Unsupported sample_rate={sample_rate}")
+    if fmt == "opus" and sample_rate not in OPUS_SAMPLE_RATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"opus supports sample_rate in {list(OPUS_SAMPLE_RATES)}",
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Kokoro synth failed: {e}")
 
-    # Optional save (never break request if it fails)
+    debug = bool(body.debug_timing)
+    if debug and not settings.debug_timing_enabled:
+        raise HTTPException(status_code=403, detail="debug_timing is disabled on this server")
+
+    timings = timing.start(trace=debug)
+    key = speech_key(text, body.voice, speed, lang, sample_rate, fmt)
+    etag = f'"{key}"'
+    # A debug trace always synthesizes, so it shows where the time goes.
+    if not debug and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    hit = audio_cache.get(key) if audio_cache is not None and not debug else None
+    if hit is not None:
+        blob, ctype = hit
+        headers = {
+            "ETag": etag,
+            "X-Cache": "HIT",
+            "Server-Timing": 'cache;desc="HIT", ' + timing.server_timing(timings, total=timings.elapsed_ms()),
+        }
+        if body.stream:
+            return StreamingResponse(_iter_bytes(blob), media_type=ctype, headers=headers)
+        return Response(content=blob, media_type=ctype, headers=headers)
+
+    observed = _RequestMetrics(body.voice, fmt, lang)
     try:
-        _ = maybe_save(
-            audio=audio,
-            sr=sr,
-            basename="out",
-            enable=body.save if body.save is not None else settings.save_audio,
+        job = await executor.acquire()
+    except SynthesisRejected as e:
+        observed.finish()
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    if body.stream:
+        try:
+            try:
+                chunks, sr = await job.call(
+                    synthesize_iter,
+                    text=text,
+                    voice=body.voice,
+                    speed=speed,
+                    lang_code=lang_code,
+                    sample_rate=sample_rate,
+                )
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Kokoro synth failed: {e}")
+            stream, ctype = stream_audio(observed.count(_tee_and_save(chunks, sr, save)), sr, fmt)
+            if audio_cache is not None and fmt in CACHEABLE_STREAM_FORMATS:
+                stream = _tee_into_cache(stream, key, ctype, fmt)
+            body_iter = observed.watch(job.iterate(stream), job, timings, sr)
+            if debug:
+                nbytes = 0
+                async for data in body_iter:
+                    nbytes += len(data)
+                return _timing_trace(body, lang, timings, job, observed, sr, nbytes, ctype)
+        except BaseException:
+            job.release()
+            observed.finish()
+            raise
+        # Headers go out before synthesis, so only the queue wait and any
+        # pipeline build are in here; the rest is in /metrics and the debug trace.
+        return _JobStreamingResponse(
+            body_iter,
+            job,
+            observed,
+            media_type=ctype,
+            headers={
+                "ETag": etag,
+                "X-Cache": "MISS",
+                "X-Queue-Wait-Ms": f"{job.wait_ms:.1f}",
+                "Server-Timing": 'cache;desc="MISS", ' + timing.server_timing(timings, queue=job.wait_ms),
+            },
         )
-    except Exception:
-        pass
 
     try:
-        blob, ctype = encode_audio(audio, sr, fmt)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Encoding failed: {e}")
+        try:
+            audio, sr = await job.call(
+                synthesize_np,
+                text=text,
+                voice=body.voice,
+                speed=speed,
+                lang_code=lang_code,
+                sample_rate=sample_rate,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Kokoro synth failed: {e}")
 
-    if body.stream:
-        def _iter(b: bytes, sz: int = 64 * 1024):
-            for i in range(0, len(b), sz):
-                yield b[i:i+sz]
-        return StreamingResponse(_iter(blob), media_type=ctype)
+        # Optional save: queued for the background writer, skipped if it is backed up
+        maybe_save(audio=audio, sr=sr, basename="out", enable=save)
+
+        try:
+            blob, ctype = await job.call(encode_audio, audio, sr, fmt)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Encoding failed: {e}")
+        observed.first_audio()
+        observed.samples = audio.size
+        observed.finish(job, timings, sr)
+    finally:
+        job.release()
+        observed.finish()
+
+    if audio_cache is not None:
+        audio_cache.put(key, blob, ctype)
+    if debug:
+        return _timing_trace(body, lang, timings, job, observed, sr, len(blob), ctype)
+
+    return Response(
+        content=blob,
+        media_type=ctype,
+        headers={
+            "ETag": etag,
+            "X-Cache": "MISS",
+            "X-Queue-Wait-Ms": f"{job.wait_ms:.1f}",
+            "X-Run-Ms": f"{job.run_ms:.1f}",
+            "X-G2P-Ms": f"{timings.get('g2p'):.1f}",
+            "X-Acoustic-Ms": f"{timings.get('acoustic'):.1f}",
+            "X-Encode-Ms": f"{timings.get('encode'):.1f}",
+            "Server-Timing": 'cache;desc="MISS", ' + timing.server_timing(
+                timings, queue=job.wait_ms, run=job.run_ms, total=timings.elapsed_ms()
+            ),
+        },
+    )
+
+class _JobStreamingResponse(StreamingResponse):
+    """Streams ``content`` and frees the worker slot when the response ends.
+
+    The body generator releases the slot as well, but it may never start
+    (client gone before ``http.response.start``) or be abandoned mid-stream
+    without being closed; ``job.release`` and ``finish`` are idempotent.
+    """
+
+    def __init__(self, content, job, observed: "_RequestMetrics", **kwargs):
+        super().__init__(content, **kwargs)
+        self._job = job
+        self._observed = observed
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._job.release()
+            self._observed.finish()
+
+def _timing_trace(
+    body: AudioSpeechIn,
+    lang: str,
+    timings: timing.Timings,
+    job,
+    observed: "_RequestMetrics",
+    sr: int,
+    nbytes: int,
+    ctype: str,
+) -> JSONResponse:
+    """``debug_timing`` response: what the request did and where its time went."""
+    total_ms = timings.elapsed_ms()
+    audio_ms = observed.samples * 1000.0 / sr if sr else 0.0
+    trace = {
+        "request": {
+            "voice": body.voice or settings.default_voice,
+            "format": observed.labels[1],
+            "lang_code": lang,
+            "sample_rate": sr,
+            "stream": bool(body.stream),
+            "chars": len(body.input),
+        },
+        "total_ms": round(total_ms, 3),
+        "queue_ms": round(job.wait_ms, 3),
+        "run_ms": round(job.run_ms, 3),
+        "ttfa_ms": round(observed.ttfa_ms, 3) if observed.ttfa_ms is not None else None,
+        "audio_ms": round(audio_ms, 3),
+        "rtf": round(job.run_ms / audio_ms, 4) if audio_ms else None,
+        "bytes": nbytes,
+        "content_type": ctype,
+        **timings.trace(),
+    }
+    return JSONResponse(
+        trace,
+        headers={
+            "X-Cache": "MISS",
+            "Server-Timing": 'cache;desc="MISS", ' + timing.server_timing(
+                timings, queue=job.wait_ms, run=job.run_ms, total=total_ms
+            ),
+        },
+    )
+
+def _voice_label(voice: Optional[str]) -> str:
+    """Metrics label: the voice id, or "blend" so recipes don't explode label cardinality."""
+    parts = parse_recipe(voice)
+    return parts[0][0] if len(parts) == 1 else "blend"
+
+class _RequestMetrics:
+    """What /metrics needs from one synthesized request, streamed or not."""
+
+    def __init__(self, voice: Optional[str], fmt: str, lang_code: str):
+        self.labels = (_voice_label(voice), fmt, lang_code)
+        self.started = time.perf_counter()
+        self.ttfa_ms: Optional[float] = None
+        self.samples = 0
+        self._done = False
+        metrics.IN_FLIGHT.inc()
+
+    def first_audio(self) -> None:
+        if self.ttfa_ms is None:
+            self.ttfa_ms = (time.perf_counter() - self.started) * 1000.0
+
+    def finish(self, job=None, timings: Optional[timing.Timings] = None, sr: int = 0) -> None:
+        """Leave the in-flight gauge; with a job, also record the request (once)."""
+        if self._done:
+            return
+        self._done = True
+        metrics.IN_FLIGHT.dec()
+        if job is not None:
+            metrics.observe_request(
+                self.labels, timings, job.wait_ms, job.run_ms, self.ttfa_ms or 0.0,
+                self.samples / float(sr) if sr else 0.0,
+            )
+
+    def count(self, chunks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        for chunk in chunks:
+            self.samples += chunk.size
+            yield chunk
+
+    async def watch(self, stream: AsyncIterator[bytes], job, timings: timing.Timings, sr: int) -> AsyncIterator[bytes]:
+        """Pass the response stream through; record it only if it runs to completion."""
+        try:
+            async for data in stream:
+                self.first_audio()
+                yield data
+            self.finish(job, timings, sr)
+        finally:
+            self.finish()
+
+def _tee_and_save(chunks: Iterator[np.ndarray], sr: int, enable: bool) -> Iterator[np.ndarray]:
+    """Pass segments through and save the full utterance once the stream completes."""
+    seen: List[np.ndarray] = []
+    for chunk in chunks:
+        if enable:
+            seen.append(chunk)
+        yield chunk
+    if not enable:
+        return
+    if seen:
+        maybe_save(audio=np.concatenate(seen), sr=sr, basename="out", enable=True)
+
+def _tee_into_cache(stream: Iterator[bytes], key: str, ctype: str, fmt: str) -> Iterator[bytes]:
+    """Pass encoded bytes through and cache them if the stream runs to completion.
+
+    Only for ``CACHEABLE_STREAM_FORMATS``: the cached blob is also served to
+    non-streamed requests under the same key and ETag.
+    """
+    parts: List[bytes] = []
+    for data in stream:
+        parts.append(data)
+        yield data
+    blob = b"".join(parts)
+    if fmt == "wav":
+        blob = finalize_wav_header(blob)
+    audio_cache.put(key, blob, ctype)
+
+def _iter_bytes(b: bytes, sz: int = 64 * 1024) -> Iterator[bytes]:
+    for i in range(0, len(b), sz):
+        yield b[i:i+sz]
 
-    return Response(content=blob, media_type=ctype)
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
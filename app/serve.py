@@ -0,0 +1,200 @@
+# app/serve.py
+"""Preload-and-fork server: N uvicorn workers sharing one copy of the weights.
+
+    python -m app.serve --workers 4 --port 8080
+
+``uvicorn --workers N`` starts N fresh interpreters, each loading its own
+Kokoro model and voice packs. Here the parent loads the model, the default
+G2P pipeline and every preloaded voice once, binds the listening socket,
+freezes the GC and only then forks the workers. The workers inherit those
+pages copy-on-write (inference never writes to the weights) and accept on
+the shared socket. With ``gc.freeze()`` the cyclic GC in the workers skips
+the inherited objects, so it does not dirty their pages either.
+
+The parent restarts workers that exit, forwards SIGINT/SIGTERM, and logs
+RSS / PSS / shared / private memory per worker at start-up and every
+``SERVE_MEMORY_LOG_S`` seconds. Each worker also reports its own figures
+under ``memory`` in ``/healthz``.
+
+CPU only: CUDA cannot be used in a process forked after it was initialised.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.memory import process_memory
+
+log = logging.getLogger("app.serve")
+
+
+def preload() -> None:
+    """Load everything the workers should share; runs in the parent before forking."""
+    import torch
+
+    # An OpenMP thread pool started here would not survive the fork; the
+    # workers set their own thread count.
+    torch.set_num_threads(1)
+
+    from app.tts.pipeline_pool import pipeline_pool
+    from app.tts.warmup import preload_voices
+
+    pipeline_pool.device = "cpu"
+    steps = [
+        ("model", lambda: pipeline_pool.model),
+        (f"pipeline:{settings.lang_code}", lambda: pipeline_pool.get(settings.lang_code)),
+    ]
+    steps += [(f"voice:{v}", lambda v=v: pipeline_pool.load_recipe(v)) for v in preload_voices()]
+    for name, fn in steps:
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            # Workers retry on their own during warmup, and /readyz reports it.
+            log.exception("preload %s failed", name)
+            continue
+        log.info("preloaded %s in %.0f ms", name, (time.perf_counter() - t0) * 1000)
+
+    import app.main  # noqa: F401  (routes and singletons, shared as well)
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, threads: int) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    import torch
+    import uvicorn
+
+    from app.main import app
+
+    torch.set_num_threads(threads)
+    config = uvicorn.Config(app, log_level="debug" if settings.debug else "info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, sock: socket.socket, workers: int, threads: int, memory_log_s: float):
+        self.sock = sock
+        self.workers = workers
+        self.threads = threads
+        self.memory_log_s = memory_log_s
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+        self.restarts = 0
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.sock, self.threads)
+            except BaseException:
+                log.exception("worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        log.info("started worker pid=%d", pid)
+
+    def stop(self, signum, _frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def log_memory(self) -> None:
+        total_rss = total_pss = 0.0
+        parent = process_memory()
+        if parent is not None:
+            log.info("parent pid=%d %s", os.getpid(), _fmt(parent))
+        for pid in sorted(self.children):
+            mem = process_memory(pid)
+            if mem is None:
+                continue
+            total_rss += mem["rss_mb"]
+            total_pss += mem["pss_mb"]
+            log.info("worker pid=%d %s", pid, _fmt(mem))
+        if self.children and parent is not None:
+            log.info(
+                "%d workers: sum rss=%.1f MB, sum pss (incl. parent)=%.1f MB",
+                len(self.children), total_rss, total_pss + parent["pss_mb"],
+            )
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        next_log = time.monotonic() + min(self.memory_log_s or 15.0, 15.0)
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                started = self.children.pop(pid, None)
+                metrics.mark_process_dead(pid)
+                if not self.stopping:
+                    log.warning("worker pid=%d exited (status %d); restarting", pid, status)
+                    # Don't spin if workers die straight after starting.
+                    if started is not None and time.monotonic() - started < 1.0:
+                        time.sleep(1.0)
+                    self.restarts += 1
+                    self.spawn()
+                continue
+            if not self.stopping and time.monotonic() >= next_log:
+                self.log_memory()
+                if self.memory_log_s <= 0:
+                    next_log = float("inf")
+                else:
+                    next_log = time.monotonic() + self.memory_log_s
+            time.sleep(0.2)
+
+
+def _fmt(mem: dict) -> str:
+    return " ".join(f"{k[:-3]}={v:.1f}MB" for k, v in mem.items())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default=settings.host)
+    ap.add_argument("--port", type=int, default=settings.port)
+    ap.add_argument("--workers", type=int, default=settings.serve_workers or (os.cpu_count() or 1))
+    ap.add_argument("--threads", type=int, default=settings.serve_torch_threads, help="torch threads per worker")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    if settings.device not in (None, "", "cpu"):
+        raise SystemExit("app.serve shares weights by forking and only supports KOKORO_DEVICE=cpu")
+    workers = max(1, args.workers)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+
+    preload()
+    sock = bind(args.host, args.port)
+    gc.collect()
+    gc.freeze()
+    log.info("serving on %s:%d with %d workers x %d torch threads", args.host, args.port, workers, threads)
+    Supervisor(sock, workers, threads, settings.serve_memory_log_s).run()
+
+
+if __name__ == "__main__":
+    main()
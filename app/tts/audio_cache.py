@@ -0,0 +1,89 @@
+# app/tts/audio_cache.py
+"""Content-addressed cache of encoded /v1/audio/speech responses.
+
+The key covers everything that changes the output bytes, so the key itself
+doubles as the response ``ETag``. Lookups go memory first, then disk (when
+``AUDIO_CACHE_DIR`` is set); disk hits are promoted back into memory.
+"""
+import re
+from typing import Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.tts.cache import BoundedLRU, DiskStore, content_key
+from app.tts.voices import canonical_recipe
+
+_BREAKS = re.compile(r"\s*\n\s*")
+_SPACES = re.compile(r"[^\S\n]+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse spaces within lines, but keep line breaks: the engine splits on them."""
+    text = _BREAKS.sub("\n", (text or "").strip())
+    return _SPACES.sub(" ", text)
+
+
+def normalize_voice(voice: Optional[str]) -> str:
+    return canonical_recipe(voice)
+
+
+def speech_key(text: str, voice: Optional[str], speed: float, lang_code: str, sample_rate: int, fmt: str) -> str:
+    return content_key(
+        text=normalize_text(text),
+        voice=normalize_voice(voice),
+        speed=round(float(speed), 4),
+        lang_code=lang_code,
+        sample_rate=int(sample_rate),
+        fmt=fmt,
+    )
+
+
+def _pack(blob: bytes, ctype: str) -> bytes:
+    return ctype.encode("ascii") + b"\n" + blob
+
+
+def _unpack(data: bytes) -> Tuple[bytes, str]:
+    ctype, _, blob = data.partition(b"\n")
+    return blob, ctype.decode("ascii")
+
+
+class AudioCache:
+    def __init__(self, memory_mb: float, disk_dir: Optional[str] = None, disk_mb: float = 0):
+        self.memory = BoundedLRU(int(memory_mb * 1024 * 1024), sizeof=lambda v: len(v[0]))
+        self.disk = DiskStore(disk_dir, int(disk_mb * 1024 * 1024)) if disk_dir else None
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        hit = self._lookup(key)
+        metrics.cache_lookup("audio", hit is not None)
+        return hit
+
+    def _lookup(self, key: str) -> Optional[Tuple[bytes, str]]:
+        hit = self.memory.get(key)
+        if hit is not None:
+            return hit
+        if self.disk is None:
+            return None
+        data = self.disk.get(key)
+        if data is None:
+            return None
+        hit = _unpack(data)
+        self.memory.put(key, hit)
+        return hit
+
+    def put(self, key: str, blob: bytes, ctype: str) -> None:
+        self.memory.put(key, (blob, ctype))
+        if self.disk is not None:
+            self.disk.put(key, _pack(blob, ctype))
+
+    def stats(self) -> dict:
+        out = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            out["disk"] = self.disk.stats()
+        return out
+
+
+audio_cache: Optional[AudioCache] = (
+    AudioCache(settings.audio_cache_mb, settings.audio_cache_dir or None, settings.audio_cache_disk_mb)
+    if settings.audio_cache_enabled
+    else None
+)
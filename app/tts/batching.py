@@ -0,0 +1,177 @@
+# app/tts/batching.py
+"""Dynamic micro-batching of Kokoro forward passes across concurrent requests.
+
+Executor threads hand their phoneme segments to ``BatchScheduler.infer`` and
+block. A single scheduler thread collects whatever arrives within
+``max_wait_ms`` (up to ``max_batch`` segments) and runs them together, then
+scatters each result back to its caller.
+
+Only the text side of KModel is padding-safe: ALBERT honours the attention
+mask and every LSTM in the duration/text encoders is run on packed
+sequences. The prosody (F0/N) blocks and the iSTFTNet decoder use
+InstanceNorm over time, so padding would change their output; they run per
+segment on the exact alignment, which keeps batched audio identical to the
+unbatched path.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from app.core.config import settings
+from app.tts.pipeline_pool import pipeline_pool
+
+if TYPE_CHECKING:
+    import torch
+    from kokoro import KModel
+
+log = logging.getLogger(__name__)
+
+
+class _Pending:
+    __slots__ = ("ids", "ref_s", "speed", "future", "enqueued")
+
+    def __init__(self, ids: List[int], ref_s: "torch.Tensor", speed: float):
+        self.ids = ids
+        self.ref_s = ref_s
+        self.speed = speed
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+def input_ids(model: "KModel", ps: str) -> List[int]:
+    """Token ids as ``KModel.forward`` builds them, including the boundary tokens."""
+    ids = [i for i in (model.vocab.get(p) for p in ps) if i is not None]
+    if len(ids) + 2 > model.context_length:
+        raise ValueError(f"{len(ids) + 2} tokens exceed the model context of {model.context_length}")
+    return [0, *ids, 0]
+
+
+def forward_batch(model: "KModel", items: List[Tuple[List[int], "torch.Tensor", float]]) -> List["torch.Tensor"]:
+    """Batched equivalent of ``KModel.forward`` for ``(input_ids, ref_s, speed)`` items.
+
+    ``ref_s`` is the already-indexed style vector (``pack[len(ps) - 1]``).
+    """
+    import torch
+    from torch import nn
+
+    with torch.no_grad():
+        device = model.device
+        ids = [x for x, _, _ in items]
+        lengths = torch.tensor([len(x) for x in ids], dtype=torch.long)
+        n, t_max = len(ids), int(lengths.max())
+
+        input_ids = torch.zeros((n, t_max), dtype=torch.long)
+        for i, x in enumerate(ids):
+            input_ids[i, : len(x)] = torch.tensor(x, dtype=torch.long)
+        input_ids = input_ids.to(device)
+        text_mask = (torch.arange(t_max).unsqueeze(0) >= lengths.unsqueeze(1)).to(device)
+        ref_s = torch.cat([r.reshape(1, -1) for _, r, _ in items]).to(device)
+        speed = torch.tensor([float(sp) for _, _, sp in items], device=device).unsqueeze(1)
+        s = ref_s[:, 128:]
+
+        bert_dur = model.bert(input_ids, attention_mask=(~text_mask).int())
+        d_en = model.bert_encoder(bert_dur).transpose(-1, -2)
+        d = model.predictor.text_encoder(d_en, s, lengths, text_mask)
+        packed = nn.utils.rnn.pack_padded_sequence(d, lengths, batch_first=True, enforce_sorted=False)
+        x, _ = model.predictor.lstm(packed)
+        x, _ = nn.utils.rnn.pad_packed_sequence(x, batch_first=True, total_length=t_max)
+        duration = torch.sigmoid(model.predictor.duration_proj(x)).sum(axis=-1) / speed
+        pred_dur = torch.round(duration).clamp(min=1).long()
+        t_en = model.text_encoder(input_ids, lengths, text_mask)
+
+        out = []
+        for i in range(n):
+            L = int(lengths[i])
+            dur = pred_dur[i, :L]
+            indices = torch.repeat_interleave(torch.arange(L, device=device), dur)
+            aln = torch.zeros((L, indices.shape[0]), device=device)
+            aln[indices, torch.arange(indices.shape[0], device=device)] = 1
+            aln = aln.unsqueeze(0)
+            en = d[i : i + 1, :L].transpose(-1, -2) @ aln
+            F0_pred, N_pred = model.predictor.F0Ntrain(en, s[i : i + 1])
+            asr = t_en[i : i + 1, :, :L] @ aln
+            audio = model.decoder(asr, F0_pred, N_pred, ref_s[i : i + 1, :128]).squeeze()
+            out.append(audio.cpu())
+        return out
+
+
+class BatchScheduler:
+    def __init__(self, model_getter, max_batch: int, max_wait_ms: float):
+        self._model_getter = model_getter
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.items = 0
+        self.max_seen = 0
+        self.queue_delay_ms = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="kokoro-batcher", daemon=True)
+                    self._thread.start()
+
+    def infer(self, ps: str, pack: "torch.Tensor", speed: float) -> Tuple["torch.Tensor", float]:
+        """Blocking; returns ``(audio, queue_delay_ms)`` for one phoneme segment."""
+        self._ensure_started()
+        # Validate here so one bad segment cannot fail everyone else's batch.
+        item = _Pending(input_ids(self._model_getter(), ps), pack[len(ps) - 1], speed)
+        self._queue.put(item)
+        return item.future.result()
+
+    def _collect(self) -> List[_Pending]:
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                audios = forward_batch(self._model_getter(), [(b.ids, b.ref_s, b.speed) for b in batch])
+            except Exception as e:
+                log.exception("batched forward failed (%d segments)", len(batch))
+                for b in batch:
+                    b.future.set_exception(e)
+                continue
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.max_seen = max(self.max_seen, len(batch))
+                for b in batch:
+                    self.queue_delay_ms += (started - b.enqueued) * 1000.0
+            for b, audio in zip(batch, audios):
+                b.future.set_result((audio, (started - b.enqueued) * 1000.0))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_seen,
+                "avg_queue_delay_ms": round(self.queue_delay_ms / self.items, 2) if self.items else 0.0,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
+
+
+batch_scheduler: Optional[BatchScheduler] = (
+    BatchScheduler(lambda: pipeline_pool.model, settings.batch_max_size, settings.batch_max_wait_ms)
+    if settings.batching_enabled
+    else None
+)
@@ -0,0 +1,166 @@
+# app/tts/encoders.py
+"""In-process audio encoders and per-format encode timing.
+
+MP3, Ogg/Vorbis and Ogg/Opus are encoded by libsndfile (1.1+ links LAME,
+libvorbis and libopus) inside the synthesis thread, so a request no longer
+forks an ffmpeg process the way ``pydub.AudioSegment.export`` does. pydub
+is only used when the linked libsndfile lacks the codec, and for AAC,
+which libsndfile cannot write. ``pcm`` is raw s16le with no container and
+no codec; ``mulaw``/``alaw`` are raw 8 kHz G.711 from ``g711.py``. The
+libsndfile encoders also take PCM incrementally for ``stream: true`` (see
+``streaming.py``).
+"""
+import io
+import shutil
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Tuple, Union
+
+import numpy as np
+import soundfile as sf
+
+from app.core import timing
+from app.tts import g711
+from app.tts.pcm import encode_wav, pcm16_bytes
+
+Blob = Union[bytes, memoryview]
+
+CONTENT_TYPES = {
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "ogg": "audio/ogg",
+    "mp3": "audio/mpeg",
+    "pcm": "audio/pcm",
+    "opus": "audio/opus",
+    "aac": "audio/aac",
+    "mulaw": "audio/PCMU",
+    "alaw": "audio/PCMA",
+}
+
+# Headerless G.711 telephony formats; always 8 kHz.
+G711_FORMATS = ("mulaw", "alaw")
+
+# fmt -> (libsndfile format, subtype) for the codecs libsndfile can write.
+SNDFILE_CODECS = {
+    "flac": ("FLAC", "PCM_16"),
+    "ogg": ("OGG", "VORBIS"),
+    "mp3": ("MP3", "MPEG_LAYER_III"),
+    "opus": ("OGG", "OPUS"),
+}
+
+# Rates the Opus codec can encode; others would need a second resample.
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+# Frames per libsndfile write. libvorbis sizes stack buffers by the write
+# length, so one multi-minute write crashes the process.
+SNDFILE_BLOCK = 1 << 15
+
+# pydub/ffmpeg muxer names where they differ from ours.
+_FFMPEG_FORMATS = {"aac": "adts"}
+
+# The pydub fallback runs ffmpeg as a subprocess; looked up once at import.
+FFMPEG = shutil.which("ffmpeg")
+
+
+@lru_cache(maxsize=None)
+def libsndfile_supports(fmt: str, subtype: str = None) -> bool:
+    if fmt not in sf.available_formats():
+        return False
+    return subtype is None or subtype in sf.available_subtypes(fmt)
+
+
+def format_available(fmt: str) -> bool:
+    """Whether ``fmt`` can be encoded here (pydub formats need ffmpeg on PATH)."""
+    fmt = (fmt or "wav").lower()
+    if fmt not in CONTENT_TYPES or fmt in ("wav", "pcm") or fmt in G711_FORMATS:
+        return True
+    codec = SNDFILE_CODECS.get(fmt)
+    if codec is not None and libsndfile_supports(*codec):
+        return True
+    return FFMPEG is not None
+
+
+class EncoderStats:
+    """Per-format call count, encode time, output bytes and audio seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, fmt: str, ms: float, nbytes: int, seconds: float) -> None:
+        with self._lock:
+            s = self._formats.setdefault(fmt, {"calls": 0, "ms": 0.0, "bytes": 0, "audio_s": 0.0})
+            s["calls"] += 1
+            s["ms"] += ms
+            s["bytes"] += nbytes
+            s["audio_s"] += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                fmt: {
+                    "calls": s["calls"],
+                    "total_ms": round(s["ms"], 2),
+                    "avg_ms": round(s["ms"] / s["calls"], 3) if s["calls"] else 0.0,
+                    "ms_per_audio_s": round(s["ms"] / s["audio_s"], 3) if s["audio_s"] else 0.0,
+                    "bytes": int(s["bytes"]),
+                }
+                for fmt, s in self._formats.items()
+            }
+
+
+encoder_stats = EncoderStats()
+
+
+def observe(fmt: str, ms: float, nbytes: int, samples: int, sr: int) -> None:
+    """Attribute encode time to the current request and the per-format totals."""
+    timing.record("encode", ms)
+    encoder_stats.record(fmt, ms, nbytes, samples / float(sr) if sr else 0.0)
+
+
+def sndfile_write(f: sf.SoundFile, audio: np.ndarray) -> None:
+    """Write ``audio`` to ``f`` in ``SNDFILE_BLOCK``-sized, clipped pieces."""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    for i in range(0, audio.size, SNDFILE_BLOCK):
+        f.write(np.clip(audio[i : i + SNDFILE_BLOCK], -1.0, 1.0))
+
+
+def _sndfile_encode(audio: np.ndarray, sr: int, fmt: str, subtype: str) -> bytes:
+    # BytesIO is seekable, so codecs can still patch their headers on close.
+    buf = io.BytesIO()
+    with sf.SoundFile(buf, mode="w", samplerate=sr, channels=1, format=fmt, subtype=subtype) as f:
+        sndfile_write(f, audio)
+    return buf.getvalue()
+
+
+def _pydub_encode(audio: np.ndarray, sr: int, fmt: str) -> bytes:
+    from pydub import AudioSegment  # fallback only; spawns ffmpeg
+
+    seg = AudioSegment(pcm16_bytes(audio).tobytes(), frame_rate=sr, sample_width=2, channels=1)
+    out = io.BytesIO()
+    seg.export(out, format=_FFMPEG_FORMATS.get(fmt, fmt))
+    return out.getvalue()
+
+
+def encode_raw(audio: np.ndarray, sr: int, fmt: str) -> Tuple[Blob, str]:
+    """Encode a whole clip without recording timings. Unknown formats fall back to WAV."""
+    fmt = (fmt or "wav").lower()
+    if fmt not in CONTENT_TYPES or fmt == "wav":
+        return encode_wav(audio, sr), "audio/wav"
+    if fmt == "pcm":
+        return pcm16_bytes(audio), CONTENT_TYPES[fmt]
+    if fmt in G711_FORMATS:
+        return g711.encode(audio, fmt), CONTENT_TYPES[fmt]
+    codec = SNDFILE_CODECS.get(fmt)
+    if codec is not None and libsndfile_supports(*codec):
+        return _sndfile_encode(audio, sr, *codec), CONTENT_TYPES[fmt]
+    return _pydub_encode(audio, sr, fmt), CONTENT_TYPES[fmt]
+
+
+def encode(audio: np.ndarray, sr: int, fmt: str) -> Tuple[Blob, str]:
+    fmt = (fmt or "wav").lower()
+    t0 = time.perf_counter()
+    blob, ctype = encode_raw(audio, sr, fmt)
+    observe(fmt if fmt in CONTENT_TYPES else "wav", (time.perf_counter() - t0) * 1000.0, len(blob), np.asarray(audio).size, sr)
+    return blob, ctype
@@ -0,0 +1,130 @@
+# app/tts/executor.py
+"""Bounded worker pool that keeps Kokoro synthesis off the asyncio event loop.
+
+Requests first take a worker slot (waiting in a bounded queue if all workers
+are busy), then run their CPU-bound steps on a dedicated thread pool. When
+the queue is full the request is rejected straight away instead of piling up.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class SynthesisRejected(Exception):
+    """Raised when a request cannot be admitted; maps to an HTTP error."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Job:
+    """A held worker slot plus the wait/run timings of one request."""
+
+    def __init__(self, executor: "SynthesisExecutor", wait_ms: float):
+        self._executor = executor
+        self._released = False
+        self.wait_ms = wait_ms
+        self.run_ms = 0.0
+
+    async def call(self, fn: Callable, *args, **kwargs) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return await self._executor._submit(fn, *args, **kwargs)
+        finally:
+            self.run_ms += (time.perf_counter() - t0) * 1000.0
+
+    async def iterate(self, it: Iterator) -> AsyncIterator:
+        """Drive a blocking iterator on the pool; the slot is released when it ends."""
+        try:
+            while True:
+                item = await self.call(next, it, _DONE)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self.release()
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._executor._release(self)
+
+
+class SynthesisExecutor:
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = float(queue_timeout)
+        self.retry_after = int(retry_after)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="kokoro-synth")
+        self._slots = asyncio.Semaphore(self.workers)
+        self._waiting = 0
+        self._running = 0
+
+    async def acquire(self) -> Job:
+        # Counters are updated before the first await, so this check cannot race.
+        if self._running + self._waiting >= self.workers + self.max_queue:
+            raise SynthesisRejected(429, "Synthesis queue is full", self.retry_after)
+        self._waiting += 1
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise SynthesisRejected(503, "Timed out waiting for a synthesis worker", self.retry_after)
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        return Job(self, (time.perf_counter() - t0) * 1000.0)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        job = await self.acquire()
+        try:
+            return await job.call(fn, *args, **kwargs)
+        finally:
+            job.release()
+
+    async def _submit(self, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._pool, lambda: ctx.run(fn, *args, **kwargs))
+
+    def _release(self, job: Job) -> None:
+        self._running -= 1
+        self._slots.release()
+        log.debug("synthesis job done: wait_ms=%.1f run_ms=%.1f", job.wait_ms, job.run_ms)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_queue": self.max_queue,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _default_workers() -> int:
+    return settings.synth_workers or min(4, os.cpu_count() or 1)
+
+
+executor = SynthesisExecutor(
+    workers=_default_workers(),
+    max_queue=settings.synth_max_queue,
+    queue_timeout=settings.synth_queue_timeout,
+    retry_after=settings.synth_retry_after,
+)
@@ -0,0 +1,92 @@
+# app/tts/g711.py
+"""Table-driven G.711 μ-law / A-law codec.
+
+Both companding laws are tabulated once for all 65536 int16 inputs (and the
+256 codes for decoding), following the reference Sun/ITU ``g711.c``
+segment rules. Encoding a buffer is then one ``np.take`` per block on the
+int16 samples produced by ``pcm.float_to_pcm16_into``.
+"""
+import numpy as np
+
+from app.tts.pcm import float_to_pcm16_into
+
+SAMPLE_RATE = 8000
+
+_BLOCK = 1 << 16
+
+_SEG_UEND = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_SEG_AEND = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 8159
+
+
+def _all_int16() -> np.ndarray:
+    # Indexed by the uint16 view of an int16 sample.
+    return np.arange(1 << 16, dtype=np.uint16).view(np.int16).astype(np.int32)
+
+
+def _build_ulaw() -> np.ndarray:
+    pcm = _all_int16() >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    mag = np.minimum(np.abs(pcm), _ULAW_CLIP) + (_ULAW_BIAS >> 2)
+    seg = np.searchsorted(_SEG_UEND, mag)
+    code = np.where(seg >= 8, 0x7F, (seg << 4) | ((mag >> (seg + 1)) & 0x0F))
+    return ((code ^ mask) & 0xFF).astype(np.uint8)
+
+
+def _build_alaw() -> np.ndarray:
+    pcm = _all_int16() >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    mag = np.where(pcm >= 0, pcm, -pcm - 1)
+    seg = np.searchsorted(_SEG_AEND, mag)
+    code = np.where(seg >= 8, 0x7F, (seg << 4) | ((mag >> np.maximum(seg, 1)) & 0x0F))
+    return ((code ^ mask) & 0xFF).astype(np.uint8)
+
+
+def _build_ulaw_decode() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0x0F) << 3) + _ULAW_BIAS) << ((u & 0x70) >> 4)
+    return np.where(u & 0x80, _ULAW_BIAS - t, t - _ULAW_BIAS).astype(np.int16)
+
+
+def _build_alaw_decode() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    seg = (a & 0x70) >> 4
+    t = (a & 0x0F) << 4
+    t = np.where(seg == 0, t + 8, np.where(seg == 1, t + 0x108, (t + 0x108) << np.maximum(seg - 1, 0)))
+    return np.where(a & 0x80, t, -t).astype(np.int16)
+
+
+ULAW_ENCODE = _build_ulaw()
+ALAW_ENCODE = _build_alaw()
+ULAW_DECODE = _build_ulaw_decode()
+ALAW_DECODE = _build_alaw_decode()
+
+_ENCODE = {"mulaw": ULAW_ENCODE, "alaw": ALAW_ENCODE}
+_DECODE = {"mulaw": ULAW_DECODE, "alaw": ALAW_DECODE}
+
+
+def encode_pcm16(pcm: np.ndarray, law: str) -> np.ndarray:
+    """int16 samples -> G.711 codes (uint8)."""
+    return np.take(_ENCODE[law], np.asarray(pcm, dtype=np.int16).view(np.uint16))
+
+
+def encode(audio: np.ndarray, law: str) -> memoryview:
+    """float32 mono -> headerless G.711 bytes (``law`` is ``"mulaw"`` or ``"alaw"``)."""
+    table = _ENCODE[law]
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    n = audio.size
+    buf = bytearray(n)
+    out = np.frombuffer(buf, dtype=np.uint8)
+    scratch = np.empty(min(n, _BLOCK), dtype=np.int16)
+    for i in range(0, n, _BLOCK):
+        j = min(i + _BLOCK, n)
+        s = scratch[: j - i]
+        float_to_pcm16_into(audio[i:j], s)
+        np.take(table, s.view(np.uint16), out=out[i:j])
+    return memoryview(buf)
+
+
+def decode(data, law: str) -> np.ndarray:
+    """G.711 bytes -> int16 samples."""
+    return np.take(_DECODE[law], np.frombuffer(data, dtype=np.uint8))
@@ -1,25 +1,30 @@
 # app/tts/kokoro_engine.py
-import io
-import os
-from typing import Optional, Tuple
+import re
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
+from app.core import timing
 from app.core.config import settings
-from kokoro import KPipeline
+from app.tts import encoders
+from app.tts.batching import batch_scheduler
+from app.tts.persist import audio_persister
+from app.tts.phoneme_cache import phoneme_cache
+from app.tts.pipeline_pool import pipeline_pool
+from app.tts.resample import Resampler
+from app.tts.segment_cache import segment_cache, segment_key
+from app.tts.stitch import Crossfader
 
-import soundfile as sf
-from pydub import AudioSegment
+if TYPE_CHECKING:
+    from kokoro import KModel, KPipeline
 
-_PIPELINE: Optional[KPipeline] = None
-_LANG_IN_USE: Optional[str] = None
+# Kokoro always renders at 24 kHz.
+NATIVE_SAMPLE_RATE = 24000
 
-def _get_pipeline(lang_code: str) -> KPipeline:
-    global _PIPELINE, _LANG_IN_USE
-    if _PIPELINE is None or _LANG_IN_USE != lang_code:
-        _PIPELINE = KPipeline(lang_code=lang_code)
-        _LANG_IN_USE = lang_code
-    return _PIPELINE
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+def _get_pipeline(lang_code: str) -> "KPipeline":
+    return pipeline_pool.get(lang_code)
 
 def _as_float32_mono(x) -> np.ndarray:
     import numpy as _np
@@ -32,6 +37,95 @@ def _as_float32_mono(x) -> np.ndarray:
     a = _np.asarray(x, dtype=_np.float32).reshape(-1)
     return a
 
+def _split_sentences(text: str) -> List[str]:
+    # Sentence-sized segments keep the first streamed chunk short and give the
+    # phoneme and segment caches reusable keys.
+    parts = []
+    for para in re.split(r"\n+", text.strip()):
+        parts.extend(s.strip() for s in _SENTENCE_SPLIT.split(para) if s.strip())
+    return parts
+
+def _phonemize(pipe: "KPipeline", sentence: str) -> List[str]:
+    """Phoneme chunks for one sentence, from the G2P cache when possible."""
+    if phoneme_cache is not None:
+        cached = phoneme_cache.get(pipe.lang_code, sentence)
+        if cached is not None:
+            return cached
+    with timing.stage("g2p"), pipeline_pool.g2p_lock(pipe.lang_code):
+        # The pool's pipelines are quiet (no model), so this only runs G2P.
+        chunks = [ps for (_gs, ps, _audio) in pipe(sentence, split_pattern=None) if ps]
+    if phoneme_cache is not None:
+        phoneme_cache.put(pipe.lang_code, sentence, chunks)
+    return chunks
+
+def _infer(model: "KModel", ps: str, pack, speed: float) -> np.ndarray:
+    with timing.stage("acoustic"):
+        if batch_scheduler is not None:
+            audio, delay_ms = batch_scheduler.infer(ps, pack, float(speed))
+            timing.record("batch_wait", delay_ms)
+        else:
+            from kokoro import KPipeline
+
+            audio = KPipeline.infer(model, ps, pack, float(speed)).audio
+    return _as_float32_mono(audio)
+
+def _render_sentence(pipe: "KPipeline", model: "KModel", sentence: str, voice: str, pack, speed: float) -> np.ndarray:
+    key = segment_key(pipe.lang_code, sentence, voice, speed) if segment_cache is not None else None
+    if key is not None:
+        cached = segment_cache.get(key)
+        if cached is not None:
+            return cached
+    parts = [_infer(model, ps, pack, speed) for ps in _phonemize(pipe, sentence)]
+    if not parts:
+        audio = np.zeros(0, dtype=np.float32)
+    else:
+        audio = np.concatenate(parts) if len(parts) > 1 else parts[0]
+    if key is not None:
+        segment_cache.put(key, audio)
+    return audio
+
+def _iter_segments(pipe: "KPipeline", sentences: List[str], voice: str, speed: float) -> Iterator[np.ndarray]:
+    model = pipeline_pool.model
+    # Multi-voice recipes are blended once into a single style pack.
+    pack = pipeline_pool.load_recipe(voice)
+    fader = Crossfader(int(NATIVE_SAMPLE_RATE * settings.segment_crossfade_ms / 1000.0))
+    for sentence in sentences:
+        out = fader.push(_render_sentence(pipe, model, sentence, voice, pack, speed))
+        if out.size:
+            yield out
+    tail = fader.flush()
+    if tail.size:
+        yield tail
+
+def _resampled(chunks: Iterator[np.ndarray], sr: int) -> Iterator[np.ndarray]:
+    resampler = Resampler(NATIVE_SAMPLE_RATE, sr)
+    if resampler.passthrough:
+        yield from chunks
+        return
+    for chunk in chunks:
+        with timing.stage("resample"):
+            out = resampler.push(chunk)
+        if out.size:
+            yield out
+    with timing.stage("resample"):
+        tail = resampler.flush()
+    if tail.size:
+        yield tail
+
+def synthesize_iter(
+    text: str,
+    voice: Optional[str] = None,
+    speed: float = 1.0,
+    lang_code: Optional[str] = None,
+    sample_rate: Optional[int] = None,
+) -> Tuple[Iterator[np.ndarray], int]:
+    """Like ``synthesize_np`` but yields audio per pipeline segment as it is rendered."""
+    voice = voice or settings.default_voice
+    lang_code = lang_code or settings.lang_code
+    sr = int(sample_rate or settings.default_sample_rate)
+    pipe = _get_pipeline(lang_code=lang_code)
+    return _resampled(_iter_segments(pipe, _split_sentences(text), voice, speed), sr), sr
+
 def synthesize_np(
     text: str,
     voice: Optional[str] = None,
@@ -44,83 +138,17 @@ def synthesize_np(
     sr = int(sample_rate or settings.default_sample_rate)
     pipe = _get_pipeline(lang_code=lang_code)
 
-    voices = [v.strip() for v in (voice or "").split("+") if v.strip()] or [settings.default_voice]
-    rendered = []
+    chunks = list(_resampled(_iter_segments(pipe, _split_sentences(text), voice, speed), sr))
+    if not chunks:
+        return np.zeros(0, dtype=np.float32), sr
+    return (np.concatenate(chunks) if len(chunks) > 1 else chunks[0]), sr
 
-    for v in voices:
-        chunks = []
-        gen = pipe(text, voice=v, speed=float(speed), split_pattern=r"\n+")
-        for (_gs, _ps, audio) in gen:
-            chunks.append(_as_float32_mono(audio))
-        if chunks:
-            rendered.append(np.concatenate(chunks) if len(chunks) > 1 else chunks[0])
+def encode_audio(audio: np.ndarray, sr: int, fmt: str) -> Tuple[Union[bytes, memoryview], str]:
+    return encoders.encode(audio, sr, fmt)
 
-    if not rendered:
-        return np.zeros(0, dtype=np.float32), sr
-    if len(rendered) == 1:
-        return rendered[0], sr
-
-    # Simple equal-power average (pad to max length first)
-    maxlen = max(len(a) for a in rendered)
-    out = np.zeros(maxlen, dtype=np.float32)
-    for a in rendered:
-        if len(a) < maxlen:
-            a = np.pad(a, (0, maxlen - len(a)))
-        out += a
-    out /= float(len(rendered))
-    out = np.clip(out, -1.0, 1.0)
-    return out, sr
-
-def _encode_wav_bytes(audio: np.ndarray, sr: int) -> bytes:
-    buf = io.BytesIO()
-    sf.write(buf, audio, sr, format="WAV", subtype="PCM_16")
-    return buf.getvalue()
-
-def _encode_flac_bytes(audio: np.ndarray, sr: int) -> bytes:
-    buf = io.BytesIO()
-    sf.write(buf, audio, sr, format="FLAC")
-    return buf.getvalue()
-
-def _encode_ogg_bytes(audio: np.ndarray, sr: int) -> bytes:
-    buf = io.BytesIO()
-    try:
-        sf.write(buf, audio, sr, format="OGG", subtype="VORBIS")
-        return buf.getvalue()
-    except Exception:
-        seg = AudioSegment(
-            (audio * 32767.0).astype(np.int16).tobytes(),
-            frame_rate=sr, sample_width=2, channels=1,
-        )
-        out = io.BytesIO()
-        seg.export(out, format="ogg")
-        return out.getvalue()
-
-def _encode_mp3_bytes(audio: np.ndarray, sr: int) -> bytes:
-    seg = AudioSegment(
-        (audio * 32767.0).astype(np.int16).tobytes(),
-        frame_rate=sr, sample_width=2, channels=1,
-    )
-    out = io.BytesIO()
-    seg.export(out, format="mp3")
-    return out.getvalue()
-
-def encode_audio(audio: np.ndarray, sr: int, fmt: str) -> Tuple[bytes, str]:
-    fmt = (fmt or "wav").lower()
-    if fmt == "wav":
-        return _encode_wav_bytes(audio, sr), "audio/wav"
-    if fmt == "flac":
-        return _encode_flac_bytes(audio, sr), "audio/flac"
-    if fmt == "ogg":
-        return _encode_ogg_bytes(audio, sr), "audio/ogg"
-    if fmt == "mp3":
-        return _encode_mp3_bytes(audio, sr), "audio/mpeg"
-    # Fallback
-    return _encode_wav_bytes(audio, sr), "audio/wav"
-
-def maybe_save(audio: np.ndarray, sr: int, basename: str, enable: bool) -> Optional[str]:
+def maybe_save(audio: np.ndarray, sr: int, basename: str, enable: bool) -> bool:
+    """Queue ``audio`` for background saving; never blocks. False if not queued."""
     if not enable:
-        return None
-    os.makedirs(settings.save_dir, exist_ok=True)
-    path = os.path.join(settings.save_dir, f"{basename}.wav")
-    sf.write(path, audio, sr, format="WAV", subtype="PCM_16")
-    return path
+        return False
+    with timing.stage("save"):
+        return audio_persister.submit(audio, sr, basename)
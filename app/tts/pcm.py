@@ -0,0 +1,56 @@
+# app/tts/pcm.py
+"""float32 -> PCM_16 / WAV encoding straight into one preallocated buffer.
+
+The int16 samples are written in place into the response buffer block by
+block through a small scratch array, so encoding a clip allocates the output
+once and nothing proportional to its length besides that.
+"""
+import struct
+
+import numpy as np
+
+WAV_HEADER_SIZE = 44
+
+# Samples converted per block; the float32 scratch is 4x this in bytes.
+_BLOCK = 1 << 16
+
+
+def wav_header_into(buf, offset: int, sr: int, n_samples: int, channels: int = 1) -> None:
+    """Write a 44-byte PCM_16 RIFF/WAVE header at ``buf[offset:]``."""
+    data_size = n_samples * channels * 2
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI", buf, offset,
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sr, sr * channels * 2, channels * 2, 16,
+        b"data", data_size,
+    )
+
+
+def float_to_pcm16_into(audio: np.ndarray, out: np.ndarray) -> None:
+    """Clip, scale and round float32 ``audio`` into the int16 array ``out``."""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    n = audio.size
+    scratch = np.empty(min(n, _BLOCK), dtype=np.float32)
+    for i in range(0, n, _BLOCK):
+        j = min(i + _BLOCK, n)
+        s = scratch[: j - i]
+        np.multiply(audio[i:j], 32767.0, out=s)
+        np.clip(s, -32767.0, 32767.0, out=s)
+        np.rint(s, out=s)
+        out[i:j] = s  # exact: values are already integral and in range
+
+
+def pcm16_bytes(audio: np.ndarray) -> memoryview:
+    """Headerless s16le mono PCM."""
+    buf = bytearray(2 * np.asarray(audio).size)
+    float_to_pcm16_into(audio, np.frombuffer(buf, dtype="<i2"))
+    return memoryview(buf)
+
+
+def encode_wav(audio: np.ndarray, sr: int) -> memoryview:
+    """Complete PCM_16 WAV file in a single allocation."""
+    n = np.asarray(audio).size
+    buf = bytearray(WAV_HEADER_SIZE + 2 * n)
+    wav_header_into(buf, 0, int(sr), n)
+    float_to_pcm16_into(audio, np.frombuffer(buf, dtype="<i2", offset=WAV_HEADER_SIZE, count=n))
+    return memoryview(buf)
@@ -0,0 +1,223 @@
+# app/tts/persist.py
+"""Background persistence of synthesized audio (``SAVE_AUDIO``).
+
+Requests hand their float32 audio to ``AudioPersister.submit`` and move on:
+the item goes into a bounded queue, and when that queue is full the save is
+skipped rather than making the request wait. A single writer thread drains
+the queue in batches, encodes each item to WAV, and writes it atomically as
+``<basename>-<sha256 of the WAV>.wav`` under ``SAVE_DIR``, so identical audio
+lands in one file and concurrent requests never clobber each other. After
+each batch, files older than ``SAVE_RETENTION_HOURS`` and the oldest files
+beyond ``SAVE_MAX_MB`` are removed.
+
+If ``SAVE_DIR`` cannot be created or listed, the writer logs it and stops;
+later saves are then counted as errors, not as a full queue.
+"""
+import hashlib
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core import metrics
+from app.core.config import settings
+from app.tts.pcm import encode_wav
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AudioPersister:
+    def __init__(
+        self,
+        root: str,
+        max_queue: int,
+        batch_size: int,
+        max_bytes: int,
+        retention_s: float,
+    ):
+        self.root = root
+        self.batch_size = max(1, int(batch_size))
+        self.max_bytes = int(max_bytes)
+        self.retention_s = float(retention_s)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # path -> (size, mtime), oldest first; built lazily by the writer thread.
+        self._files: Optional["OrderedDict[str, Tuple[int, float]]"] = None
+        self._bytes = 0
+        self.queued = 0
+        self.skipped = 0
+        self.saved = 0
+        self.deduped = 0
+        self.errors = 0
+        self.evicted = 0
+        self.batches = 0
+        self.write_ms = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="audio-persist", daemon=True)
+                    self._thread.start()
+
+    def submit(self, audio: np.ndarray, sr: int, basename: str = "out") -> bool:
+        """Queue ``audio`` for saving; returns False (and drops it) if it cannot be queued."""
+        self._ensure_started()
+        if not self._thread.is_alive():
+            with self._lock:
+                self.errors += 1
+            return False
+        try:
+            self._queue.put_nowait((audio, int(sr), basename))
+        except queue.Full:
+            with self._lock:
+                self.skipped += 1
+            return False
+        with self._lock:
+            self.queued += 1
+        return True
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        try:
+            self._index()
+        except Exception:
+            log.exception("audio save directory %s is unusable; saving disabled", self.root)
+            return
+        while True:
+            batch = self._collect()
+            stop = batch[-1] is _STOP
+            items = batch[:-1] if stop else batch
+            started = time.perf_counter()
+            for audio, sr, basename in items:
+                t0 = time.perf_counter()
+                try:
+                    result = self._write(audio, sr, basename)
+                except Exception:
+                    log.exception("saving audio failed")
+                    with self._lock:
+                        self.errors += 1
+                    result = "error"
+                metrics.SAVE.labels(result).observe(time.perf_counter() - t0)
+            self._enforce_limits()
+            with self._lock:
+                self.batches += 1
+                self.write_ms += (time.perf_counter() - started) * 1000.0
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _index(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and entry.name.endswith(".wav"):
+                st = entry.stat()
+                found.append((st.st_mtime, entry.path, st.st_size))
+        self._files = OrderedDict((path, (size, mtime)) for mtime, path, size in sorted(found))
+        with self._lock:
+            self._bytes = sum(size for size, _ in self._files.values())
+
+    def _write(self, audio: np.ndarray, sr: int, basename: str) -> str:
+        wav = encode_wav(audio, sr)
+        digest = hashlib.sha256(wav).hexdigest()[:32]
+        path = os.path.join(self.root, f"{basename}-{digest}.wav")
+        now = time.time()
+        if path in self._files:
+            os.utime(path)
+            self._files[path] = (self._files[path][0], now)
+            self._files.move_to_end(path)
+            with self._lock:
+                self.deduped += 1
+            return "deduped"
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(wav)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._files[path] = (len(wav), now)
+        with self._lock:
+            self._bytes += len(wav)
+            self.saved += 1
+        return "saved"
+
+    def _enforce_limits(self) -> None:
+        cutoff = time.time() - self.retention_s if self.retention_s > 0 else None
+        while self._files:
+            path, (size, mtime) = next(iter(self._files.items()))
+            with self._lock:
+                over = self._bytes > self.max_bytes
+            if not over and (cutoff is None or mtime >= cutoff):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                log.exception("removing %s failed", path)
+                break
+            del self._files[path]
+            with self._lock:
+                self._bytes -= size
+                self.evicted += 1
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write what is already queued, then stop the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            log.warning("audio save queue still full at shutdown; pending saves dropped")
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "writer_alive": self._thread is not None and self._thread.is_alive(),
+                "queue_depth": self._queue.qsize(),
+                "queue_max": self._queue.maxsize,
+                "queued": self.queued,
+                "skipped_queue_full": self.skipped,
+                "saved": self.saved,
+                "deduped": self.deduped,
+                "errors": self.errors,
+                "evicted": self.evicted,
+                "batches": self.batches,
+                "avg_batch_ms": round(self.write_ms / self.batches, 3) if self.batches else 0.0,
+                "files": len(self._files) if self._files is not None else None,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+audio_persister = AudioPersister(
+    settings.save_dir,
+    settings.save_queue_size,
+    settings.save_batch_size,
+    int(settings.save_max_mb * 1024 * 1024),
+    settings.save_retention_hours * 3600.0,
+)
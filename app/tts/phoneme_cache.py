@@ -0,0 +1,62 @@
+# app/tts/phoneme_cache.py
+"""Sentence-level G2P cache: (lang_code, normalized sentence) -> phoneme chunks.
+
+Phonemes depend only on the language front-end and the text, not on voice or
+speed, so one entry serves every voice. Values are the list of phoneme strings
+the pipeline would feed to the model (one per <=510-phoneme chunk).
+"""
+import json
+from typing import List, Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.tts.audio_cache import normalize_text
+from app.tts.cache import BoundedLRU, DiskStore, content_key
+
+
+class PhonemeCache:
+    def __init__(self, memory_mb: float, disk_dir: Optional[str] = None, disk_mb: float = 0):
+        self.memory = BoundedLRU(
+            int(memory_mb * 1024 * 1024),
+            sizeof=lambda chunks: sum(len(p.encode("utf-8")) for p in chunks) + 64,
+        )
+        self.disk = DiskStore(disk_dir, int(disk_mb * 1024 * 1024)) if disk_dir else None
+
+    @staticmethod
+    def key(lang_code: str, sentence: str) -> str:
+        return content_key(lang_code=lang_code, text=normalize_text(sentence))
+
+    def get(self, lang_code: str, sentence: str) -> Optional[List[str]]:
+        chunks = self._lookup(self.key(lang_code, sentence))
+        metrics.cache_lookup("phoneme", chunks is not None)
+        return chunks
+
+    def _lookup(self, key: str) -> Optional[List[str]]:
+        chunks = self.memory.get(key)
+        if chunks is not None or self.disk is None:
+            return chunks
+        data = self.disk.get(key)
+        if data is None:
+            return None
+        chunks = json.loads(data.decode("utf-8"))
+        self.memory.put(key, chunks)
+        return chunks
+
+    def put(self, lang_code: str, sentence: str, chunks: List[str]) -> None:
+        key = self.key(lang_code, sentence)
+        self.memory.put(key, chunks)
+        if self.disk is not None:
+            self.disk.put(key, json.dumps(chunks, ensure_ascii=False).encode("utf-8"))
+
+    def stats(self) -> dict:
+        out = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            out["disk"] = self.disk.stats()
+        return out
+
+
+phoneme_cache: Optional[PhonemeCache] = (
+    PhonemeCache(settings.phoneme_cache_mb, settings.phoneme_cache_dir or None, settings.phoneme_cache_disk_mb)
+    if settings.phoneme_cache_enabled
+    else None
+)
@@ -0,0 +1,199 @@
+# app/tts/pipeline_pool.py
+"""Per-language KPipeline pool sharing one KModel and one voice-pack store.
+
+KPipeline is only the language front-end (G2P + chunking); the acoustic model
+is language-blind, so a single KModel is loaded once and passed to whichever
+pipeline handles the request. Pipelines are kept in an LRU bounded by
+``KOKORO_MAX_PIPELINES`` and voice packs in an LRU bounded by
+``KOKORO_VOICE_CACHE_MB`` (blended recipes are cached there too).
+
+torch, kokoro and huggingface_hub are imported on first use rather than at
+import time, so the app binds its port without paying several seconds of
+imports; startup warmup then pulls them in off the request path. With
+``KOKORO_SNAPSHOT_DIR`` set, the model and voice packs come from an mmap
+snapshot (see ``app.tts.snapshot``) instead of the pickled checkpoints.
+"""
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional
+
+from app.core import metrics, timing
+from app.core.config import settings
+from app.tts.voices import canonical_recipe, parse_recipe
+
+if TYPE_CHECKING:
+    import torch
+    from kokoro import KModel, KPipeline
+
+
+# Mirrors kokoro.pipeline.ALIASES / LANG_CODES. Kept here so request keys can
+# be built on the event loop without importing torch and kokoro; KPipeline
+# still applies its own normalization when a pipeline is built.
+LANG_ALIASES = {
+    "en-us": "a", "en-gb": "b", "es": "e", "fr-fr": "f", "hi": "h",
+    "it": "i", "pt-br": "p", "ja": "j", "zh": "z",
+}
+LANG_CODES = frozenset(LANG_ALIASES.values())
+
+
+def normalize_lang_code(lang_code: str) -> str:
+    lang_code = (lang_code or settings.lang_code).lower()
+    return LANG_ALIASES.get(lang_code, lang_code)
+
+
+class PipelinePool:
+    def __init__(
+        self,
+        repo_id: str,
+        max_pipelines: int,
+        voice_budget_mb: float,
+        device: Optional[str] = None,
+        snapshot_dir: Optional[str] = None,
+    ):
+        self.repo_id = repo_id
+        self.snapshot_dir = snapshot_dir or None
+        self.max_pipelines = max(1, int(max_pipelines))
+        self.voice_budget_bytes = int(voice_budget_mb * 1024 * 1024)
+        self.device = device
+        self._lock = threading.Lock()
+        self._model: Optional["KModel"] = None
+        self._pipelines: "OrderedDict[str, KPipeline]" = OrderedDict()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._g2p_locks: Dict[str, threading.Lock] = {}
+        self._voices: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        self._voice_bytes = 0
+        self.builds = 0
+        self.evictions = 0
+
+    @property
+    def model(self) -> "KModel":
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    with timing.stage("model"):
+                        self._model = self._load_model()
+        return self._model
+
+    def _load_model(self) -> "KModel":
+        import torch
+
+        device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+        if self.snapshot_dir:
+            from app.tts import snapshot
+
+            model = snapshot.load_model(self.snapshot_dir)
+        else:
+            from kokoro import KModel
+
+            model = KModel(repo_id=self.repo_id)
+        return model.to(device).eval()
+
+    def get(self, lang_code: str) -> "KPipeline":
+        lang_code = normalize_lang_code(lang_code)
+        with self._lock:
+            pipe = self._pipelines.get(lang_code)
+            if pipe is not None:
+                self._pipelines.move_to_end(lang_code)
+                return pipe
+            build_lock = self._build_locks.setdefault(lang_code, threading.Lock())
+
+        # Build outside the pool lock so other languages keep being served.
+        with build_lock:
+            with self._lock:
+                pipe = self._pipelines.get(lang_code)
+            if pipe is None:
+                from kokoro import KPipeline
+
+                # A "quiet" pipeline: G2P only, the shared model is passed per call.
+                with timing.stage("pipeline"):
+                    pipe = KPipeline(lang_code=lang_code, repo_id=self.repo_id, model=False)
+                with self._lock:
+                    self._pipelines[lang_code] = pipe
+                    self.builds += 1
+                    metrics.PIPELINE_BUILDS.labels(lang_code).inc()
+                    while len(self._pipelines) > self.max_pipelines:
+                        self._pipelines.popitem(last=False)
+                        self.evictions += 1
+                        metrics.PIPELINE_EVICTIONS.inc()
+        return pipe
+
+    def g2p_lock(self, lang_code: str) -> threading.Lock:
+        """Serializes G2P per language; misaki/spaCy front-ends are not thread-safe."""
+        lang_code = normalize_lang_code(lang_code)
+        with self._lock:
+            return self._g2p_locks.setdefault(lang_code, threading.Lock())
+
+    def _cached_voice(self, key: str) -> Optional["torch.Tensor"]:
+        with self._lock:
+            pack = self._voices.get(key)
+            if pack is not None:
+                self._voices.move_to_end(key)
+            return pack
+
+    def load_voice(self, voice: str) -> "torch.Tensor":
+        """Voice pack tensor for ``voice`` (a name or a local ``.pt`` path)."""
+        pack = self._cached_voice(voice)
+        if pack is not None:
+            return pack
+        with timing.stage("voice"):
+            pack = self._read_voice(voice)
+        return self._store_voice(voice, pack)
+
+    def _read_voice(self, voice: str) -> "torch.Tensor":
+        if self.snapshot_dir and not voice.endswith(".pt"):
+            from app.tts import snapshot
+
+            pack = snapshot.load_voice(self.snapshot_dir, voice)
+            if pack is not None:
+                return pack
+        import torch
+        from huggingface_hub import hf_hub_download
+
+        f = voice if voice.endswith(".pt") else hf_hub_download(repo_id=self.repo_id, filename=f"voices/{voice}.pt")
+        return torch.load(f, weights_only=True)
+
+    def load_recipe(self, recipe: Optional[str]) -> "torch.Tensor":
+        """Style pack for a voice recipe, blended in embedding space and cached by recipe."""
+        parts = parse_recipe(recipe)
+        if len(parts) == 1:
+            return self.load_voice(parts[0][0])
+        key = canonical_recipe(recipe)
+        pack = self._cached_voice(key)
+        if pack is not None:
+            return pack
+        packs = [(self.load_voice(name), w) for name, w in parts]
+        with timing.stage("blend"):
+            pack = sum(w * p for p, w in packs)
+        return self._store_voice(key, pack)
+
+    def _store_voice(self, voice: str, pack: "torch.Tensor") -> "torch.Tensor":
+        with self._lock:
+            if voice not in self._voices:
+                self._voices[voice] = pack
+                self._voice_bytes += pack.numel() * pack.element_size()
+                # Never evict the pack we are about to hand out.
+                while self._voice_bytes > self.voice_budget_bytes and len(self._voices) > 1:
+                    _, old = self._voices.popitem(last=False)
+                    self._voice_bytes -= old.numel() * old.element_size()
+            return self._voices[voice]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pipelines": list(self._pipelines),
+                "builds": self.builds,
+                "evictions": self.evictions,
+                "voices": len(self._voices),
+                "voice_mb": round(self._voice_bytes / (1024 * 1024), 2),
+                "model_loaded": self._model is not None,
+                "snapshot": self.snapshot_dir,
+            }
+
+
+pipeline_pool = PipelinePool(
+    repo_id=settings.kokoro_repo_id,
+    max_pipelines=settings.max_pipelines,
+    voice_budget_mb=settings.voice_cache_mb,
+    device=settings.device,
+    snapshot_dir=settings.snapshot_dir,
+)
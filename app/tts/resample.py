@@ -0,0 +1,128 @@
+# app/tts/resample.py
+"""Polyphase sample-rate conversion from Kokoro's native 24 kHz.
+
+A Kaiser-windowed sinc low-pass is designed once per ``(src, dst)`` pair at
+the common upsampled rate and split into ``up`` phases. Each output sample
+is the dot product of one phase with the input samples under it. Outputs
+that share a phase sit ``down`` input samples apart, so every phase is one
+matrix-vector product over a strided window view of the input.
+"""
+import math
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+# Zero crossings of the sinc on each side, counted at the lower of the two rates.
+_HALF_ZEROS = 16
+_KAISER_BETA = 8.6
+# Passband edge as a fraction of the lower Nyquist frequency.
+_ROLLOFF = 0.945
+
+
+class _Plan:
+    __slots__ = ("up", "down", "taps", "center")
+
+    def __init__(self, up: int, down: int, taps: np.ndarray, center: int):
+        self.up = up
+        self.down = down
+        self.taps = taps  # (up, K): phase p, reversed so it dots with ascending input
+        self.center = center
+
+
+@lru_cache(maxsize=32)
+def _plan(src: int, dst: int) -> _Plan:
+    g = math.gcd(src, dst)
+    up, down = dst // g, src // g
+    factor = max(up, down)
+    half = _HALF_ZEROS * factor
+    n = np.arange(-half, half + 1, dtype=np.float64)
+    fc = _ROLLOFF / (2.0 * factor)  # cycles per upsampled sample
+    h = 2.0 * fc * np.sinc(2.0 * fc * n) * np.kaiser(n.size, _KAISER_BETA) * up
+
+    k = -(-h.size // up)
+    h = np.concatenate([h, np.zeros(k * up - h.size)])
+    taps = h.reshape(k, up).T[:, ::-1].astype(np.float32)
+    return _Plan(up, down, np.ascontiguousarray(taps), half)
+
+
+def kernel_info(src: int, dst: int) -> Tuple[int, int, int]:
+    """``(up, down, taps_per_phase)`` for a rate pair; mainly for benchmarks."""
+    p = _plan(int(src), int(dst))
+    return p.up, p.down, p.taps.shape[1]
+
+
+class Resampler:
+    """Streaming resampler: ``push`` returns output that is final, ``flush`` the rest.
+
+    Input history and the filter's look-ahead are carried between calls, so
+    chunked output matches converting the whole clip at once (up to float
+    rounding) with no seams at chunk boundaries.
+    """
+
+    def __init__(self, src: int, dst: int):
+        self.src, self.dst = int(src), int(dst)
+        self.passthrough = self.src == self.dst
+        if self.passthrough:
+            return
+        self._p = _plan(self.src, self.dst)
+        k = self._p.taps.shape[1]
+        # Input samples before the stream start read as zeros.
+        self._buf = np.zeros(k - 1, dtype=np.float32)
+        self._off = -(k - 1)  # absolute index of _buf[0]
+        self._received = 0
+        self._m = 0  # next output index
+
+    def _render(self, m_end: int) -> np.ndarray:
+        p = self._p
+        k = p.taps.shape[1]
+        m0 = self._m
+        out = np.empty(max(0, m_end - m0), dtype=np.float32)
+        if not out.size:
+            return out
+        windows = np.lib.stride_tricks.sliding_window_view(self._buf, k)
+        for j in range(min(p.up, out.size)):
+            nu = (m0 + j) * p.down + p.center
+            start = nu // p.up - (k - 1) - self._off
+            count = len(range(j, out.size, p.up))
+            rows = windows[start : start + (count - 1) * p.down + 1 : p.down]
+            out[j :: p.up] = rows @ p.taps[nu % p.up]
+        self._m = m_end
+        # Keep only the history the next output still needs.
+        keep_from = (self._m * p.down + p.center) // p.up - (k - 1) - self._off
+        if keep_from > 0:
+            self._buf = self._buf[keep_from:]
+            self._off += keep_from
+        return out
+
+    def push(self, audio: np.ndarray) -> np.ndarray:
+        if self.passthrough:
+            return audio
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        self._buf = np.concatenate([self._buf, audio])
+        self._received += audio.size
+        p = self._p
+        # Output m is ready once input (m*down + center) // up has arrived.
+        ready = -(-(self._received * p.up - p.center) // p.down)
+        return self._render(max(self._m, ready))
+
+    def flush(self) -> np.ndarray:
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        p = self._p
+        total = -(-self._received * p.up // p.down)
+        last_needed = ((total - 1) * p.down + p.center) // p.up if total else 0
+        pad = last_needed + 1 - (self._off + self._buf.size)
+        if pad > 0:
+            self._buf = np.concatenate([self._buf, np.zeros(pad, dtype=np.float32)])
+        return self._render(total)
+
+
+def resample(audio: np.ndarray, src: int, dst: int) -> np.ndarray:
+    """Convert a whole clip; returns ``audio`` itself when the rates match."""
+    r = Resampler(src, dst)
+    if r.passthrough:
+        return audio
+    head = r.push(audio)
+    tail = r.flush()
+    return np.concatenate([head, tail]) if tail.size else head
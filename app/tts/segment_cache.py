@@ -0,0 +1,48 @@
+# app/tts/segment_cache.py
+"""Sentence-level audio cache.
+
+Templated messages share most of their sentences, so each rendered sentence
+is cached under (lang_code, normalized sentence, voice recipe, speed) and only
+the sentences that changed are synthesized again.
+"""
+from typing import Optional
+
+import numpy as np
+
+from app.core import metrics
+from app.core.config import settings
+from app.tts.audio_cache import normalize_text, normalize_voice
+from app.tts.cache import BoundedLRU, content_key
+
+
+def segment_key(lang_code: str, sentence: str, voice: str, speed: float) -> str:
+    return content_key(
+        lang_code=lang_code,
+        text=normalize_text(sentence),
+        voice=normalize_voice(voice),
+        speed=round(float(speed), 4),
+    )
+
+
+class SegmentCache:
+    def __init__(self, memory_mb: float):
+        self.memory = BoundedLRU(int(memory_mb * 1024 * 1024), sizeof=lambda a: a.nbytes)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        audio = self.memory.get(key)
+        metrics.cache_lookup("segment", audio is not None)
+        return audio
+
+    def put(self, key: str, audio: np.ndarray) -> None:
+        # Cached arrays are shared between requests; make accidental writes fail loudly.
+        audio = np.array(audio, dtype=np.float32, copy=True)
+        audio.setflags(write=False)
+        self.memory.put(key, audio)
+
+    def stats(self) -> dict:
+        return {"memory": self.memory.stats()}
+
+
+segment_cache: Optional[SegmentCache] = (
+    SegmentCache(settings.segment_cache_mb) if settings.segment_cache_enabled else None
+)
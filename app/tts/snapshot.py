@@ -0,0 +1,103 @@
+# app/tts/snapshot.py
+"""Memory-mapped snapshot of the Kokoro model and voice packs.
+
+``scripts/build_snapshot.py`` writes every model tensor and voice pack as a
+plain ``.npy`` file next to a ``manifest.json`` holding the model config.
+Loading maps each file with ``np.load(mmap_mode="c")`` and wraps it with
+``torch.from_numpy``, so nothing is unpickled or copied up front: pages are
+read on first touch and stay shared in the page cache between processes
+(copy-on-write, so an accidental in-place write stays private).
+
+The module skeleton is built with parameter initialisation disabled, since
+every parameter is replaced by its mapped tensor straight afterwards; a
+missing or unexpected key fails the load (``strict=True``).
+"""
+import contextlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+_EMPTY_CHECKPOINT = "empty.pth"
+
+
+@contextlib.contextmanager
+def _no_init():
+    """Turn the in-place ``torch.nn.init`` functions into no-ops."""
+    names = [n for n in dir(torch.nn.init) if n.endswith("_") and not n.startswith("_")]
+    saved = {n: getattr(torch.nn.init, n) for n in names}
+    for n in names:
+        setattr(torch.nn.init, n, lambda tensor, *args, **kwargs: tensor)
+    try:
+        yield
+    finally:
+        for n, fn in saved.items():
+            setattr(torch.nn.init, n, fn)
+
+
+def _save(root: str, rel: str, tensor: torch.Tensor) -> dict:
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    arr = tensor.detach().cpu().contiguous().numpy()
+    np.save(path, arr)
+    return {"file": rel, "dtype": str(arr.dtype), "shape": list(arr.shape)}
+
+
+def _map(root: str, entry: dict) -> torch.Tensor:
+    return torch.from_numpy(np.load(os.path.join(root, entry["file"]), mmap_mode="c"))
+
+
+@lru_cache(maxsize=None)
+def read_manifest(root: str) -> dict:
+    with open(os.path.join(root, MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"unsupported snapshot format {manifest.get('format')!r} in {root}")
+    return manifest
+
+
+def write_snapshot(root: str, model, config: dict, voices: Dict[str, torch.Tensor]) -> dict:
+    """Write ``model`` (a loaded KModel), its ``config`` dict and ``voices`` under ``root``."""
+    os.makedirs(root, exist_ok=True)
+    tensors = {k: _save(root, f"model/{k}.npy", v) for k, v in model.state_dict().items()}
+    packs = {name: _save(root, f"voices/{name}.npy", v) for name, v in voices.items()}
+    # KModel always loads a checkpoint; an empty one makes it skip straight to our tensors.
+    torch.save({}, os.path.join(root, _EMPTY_CHECKPOINT))
+    manifest = {
+        "format": FORMAT_VERSION,
+        "repo_id": model.repo_id,
+        "config": config,
+        "tensors": tensors,
+        "voices": packs,
+    }
+    with open(os.path.join(root, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    return manifest
+
+
+def load_model(root: str):
+    """KModel whose parameters are mmap-backed views of the snapshot files."""
+    from kokoro import KModel
+
+    manifest = read_manifest(root)
+    with _no_init():
+        model = KModel(
+            repo_id=manifest["repo_id"],
+            config=manifest["config"],
+            model=os.path.join(root, _EMPTY_CHECKPOINT),
+        )
+    state = {k: _map(root, entry) for k, entry in manifest["tensors"].items()}
+    model.load_state_dict(state, strict=True, assign=True)
+    return model
+
+
+def load_voice(root: str, name: str) -> Optional[torch.Tensor]:
+    """Voice pack ``name`` from the snapshot, or None if it was not included."""
+    entry = read_manifest(root)["voices"].get(name)
+    return _map(root, entry) if entry is not None else None
+
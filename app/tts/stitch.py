@@ -0,0 +1,35 @@
+# app/tts/stitch.py
+"""Joins independently rendered segments with a short equal-power crossfade."""
+import numpy as np
+
+
+class Crossfader:
+    """Streaming crossfade: ``push`` returns audio that is final, ``flush`` the held tail.
+
+    The last ``overlap`` samples of each segment are held back and blended with
+    the head of the next one, so output is identical whether segments are
+    collected up front or streamed as they are rendered.
+    """
+
+    def __init__(self, overlap: int):
+        self.overlap = max(0, int(overlap))
+        self._tail = np.zeros(0, dtype=np.float32)
+        if self.overlap:
+            t = np.linspace(0.0, np.pi / 2, self.overlap, dtype=np.float32)
+            self._fade_in = np.sin(t)
+            self._fade_out = np.cos(t)
+
+    def push(self, audio: np.ndarray) -> np.ndarray:
+        if not self.overlap:
+            return audio
+        if self._tail.size:
+            n = min(self._tail.size, audio.size)
+            head = audio[:n] * self._fade_in[:n] + self._tail[self._tail.size - n:] * self._fade_out[:n]
+            audio = np.concatenate([self._tail[: self._tail.size - n], head, audio[n:]])
+        keep = min(self.overlap, audio.size)
+        self._tail = audio[audio.size - keep:]
+        return audio[: audio.size - keep]
+
+    def flush(self) -> np.ndarray:
+        tail, self._tail = self._tail, np.zeros(0, dtype=np.float32)
+        return tail
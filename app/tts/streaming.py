@@ -0,0 +1,282 @@
+# app/tts/streaming.py
+"""Incremental encoders used by ``stream: true`` responses.
+
+Each encoder takes float32 mono chunks as they come out of the Kokoro
+generator and returns the bytes that are safe to send right away, so the
+first segment reaches the client before the rest of the input is rendered.
+"""
+import io
+import struct
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from app.core.config import settings
+from app.tts import g711
+from app.tts.encoders import (
+    CONTENT_TYPES, G711_FORMATS, SNDFILE_CODECS, encode_raw, libsndfile_supports, observe, sndfile_write,
+)
+from app.tts.pcm import WAV_HEADER_SIZE, float_to_pcm16_into, pcm16_bytes
+
+# libsndfile command (1.2+) setting how often Ogg/Opus pages are flushed.
+# Without it pages are only cut every ~1 s of Opus, which defeats streaming.
+# libsndfile's Vorbis encoder ignores it and holds pages for seconds, so
+# ogg (Vorbis) is buffered instead.
+_SFC_SET_OGG_PAGE_LATENCY_MS = 0x1302
+
+# libsndfile command selecting the MP3 bitrate mode. In the default VBR mode
+# LAME starts the file with a placeholder frame and seeks back on close to
+# fill in the Xing/Info tag; a streamed file never gets that rewrite and
+# decoders stop early. Constant bitrate needs no tag.
+_SFC_SET_BITRATE_MODE = 0x1305
+_SF_BITRATE_MODE_CONSTANT = 0
+
+# Formats whose complete stream is byte-identical to ``encoders.encode``
+# output (WAV once ``finalize_wav_header`` has run), so a finished stream may
+# be stored in the response cache. Streamed Opus/MP3 differ from the one-shot
+# files; buffered formats are left out as well and simply not cached.
+CACHEABLE_STREAM_FORMATS = frozenset({"wav", "pcm"} | set(G711_FORMATS))
+
+# Placeholder size used in RIFF headers when the total length is unknown.
+_WAV_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def wav_stream_header(sr: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """RIFF/WAVE header with open-ended RIFF and data chunk sizes."""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", _WAV_UNKNOWN_SIZE, b"WAVE",
+        b"fmt ", 16, 1, channels, sr, sr * block_align, block_align, bits_per_sample,
+        b"data", _WAV_UNKNOWN_SIZE,
+    )
+
+
+def finalize_wav_header(blob: bytes) -> bytes:
+    """Fill in the real sizes of a stream WAV once its total length is known."""
+    out = bytearray(blob)
+    struct.pack_into("<I", out, 4, len(out) - 8)
+    struct.pack_into("<I", out, 40, len(out) - 44)
+    return bytes(out)
+
+
+class StreamEncoder(ABC):
+    """Base class: ``write`` returns bytes ready to send, ``close`` flushes the tail."""
+
+    content_type = "application/octet-stream"
+    fmt = "pcm"
+
+    def __init__(self, sr: int):
+        self.sr = int(sr)
+
+    @abstractmethod
+    def write(self, audio: np.ndarray) -> bytes:
+        ...
+
+    def close(self) -> bytes:
+        return b""
+
+
+class PCMStreamEncoder(StreamEncoder):
+    """Headerless signed 16-bit little-endian mono PCM."""
+
+    content_type = "audio/pcm"
+
+    def write(self, audio: np.ndarray) -> bytes:
+        return pcm16_bytes(audio)
+
+
+class G711StreamEncoder(StreamEncoder):
+    """Headerless 8 kHz μ-law or A-law; every sample is one byte on its own."""
+
+    def __init__(self, sr: int, fmt: str):
+        super().__init__(sr)
+        self.fmt = fmt
+        self.content_type = CONTENT_TYPES[fmt]
+
+    def write(self, audio: np.ndarray) -> bytes:
+        return g711.encode(audio, self.fmt)
+
+
+class WAVStreamEncoder(PCMStreamEncoder):
+    """PCM_16 WAV whose header is sent up front with unknown sizes."""
+
+    content_type = "audio/wav"
+    fmt = "wav"
+
+    def __init__(self, sr: int):
+        super().__init__(sr)
+        self._header_sent = False
+
+    def write(self, audio: np.ndarray) -> bytes:
+        if not self._header_sent:
+            self._header_sent = True
+            n = np.asarray(audio).size
+            buf = bytearray(WAV_HEADER_SIZE + 2 * n)
+            buf[:WAV_HEADER_SIZE] = wav_stream_header(self.sr)
+            float_to_pcm16_into(audio, np.frombuffer(buf, dtype="<i2", offset=WAV_HEADER_SIZE, count=n))
+            return memoryview(buf)
+        return pcm16_bytes(audio)
+
+    def close(self) -> bytes:
+        # Empty input still has to produce a parseable file.
+        if not self._header_sent:
+            self._header_sent = True
+            return wav_stream_header(self.sr)
+        return b""
+
+
+class _TailSink(io.RawIOBase):
+    """Seekable file object for libsndfile that hands out newly appended bytes.
+
+    Rewrites of the already emitted region on close are dropped, since
+    those bytes have been sent. Encoders must therefore be configured so
+    that nothing they need is patched in afterwards (see
+    ``_SFC_SET_BITRATE_MODE`` for MP3).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buf = bytearray()
+        self._pos = 0
+        self._emitted = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._emitted + len(self._buf)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        start = self._pos - self._emitted
+        if start < 0:
+            return b""
+        end = len(self._buf) if size is None or size < 0 else start + size
+        data = bytes(self._buf[start:end])
+        self._pos += len(data)
+        return data
+
+    def write(self, data) -> int:
+        n = len(data)
+        start = self._pos - self._emitted
+        if start >= 0:
+            end = start + n
+            if end > len(self._buf):
+                self._buf.extend(b"\x00" * (end - len(self._buf)))
+            self._buf[start:end] = data
+        self._pos += n
+        return n
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._emitted += len(self._buf)
+        self._buf.clear()
+        return out
+
+
+class SoundFileStreamEncoder(StreamEncoder):
+    """In-process libsndfile encoder for frame/page-aligned containers (Opus, MP3)."""
+
+    def __init__(self, sr: int, fmt: str):
+        super().__init__(sr)
+        self.fmt = fmt
+        self.content_type = CONTENT_TYPES[fmt]
+        sf_format, subtype = SNDFILE_CODECS[fmt]
+        self._sink = _TailSink()
+        self._sf = sf.SoundFile(
+            self._sink, mode="w", samplerate=self.sr, channels=1, format=sf_format, subtype=subtype,
+        )
+        if subtype == "OPUS":
+            latency = sf._ffi.new("double*", float(settings.stream_ogg_page_ms))
+            sf._snd.sf_command(self._sf._file, _SFC_SET_OGG_PAGE_LATENCY_MS, latency, sf._ffi.sizeof("double"))
+        elif sf_format == "MP3":
+            mode = sf._ffi.new("int*", _SF_BITRATE_MODE_CONSTANT)
+            sf._snd.sf_command(self._sf._file, _SFC_SET_BITRATE_MODE, mode, sf._ffi.sizeof("int"))
+
+    def write(self, audio: np.ndarray) -> bytes:
+        sndfile_write(self._sf, audio)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._sf.close()
+        return self._sink.drain()
+
+
+class BufferedStreamEncoder(StreamEncoder):
+    """Fallback for formats libsndfile cannot write incrementally here."""
+
+    def __init__(self, sr: int, fmt: str):
+        super().__init__(sr)
+        self.fmt = fmt
+        self._chunks = []
+        self.content_type = CONTENT_TYPES.get(fmt, "audio/wav")
+
+    def write(self, audio: np.ndarray) -> bytes:
+        self._chunks.append(audio)
+        return b""
+
+    def close(self) -> bytes:
+        audio = np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=np.float32)
+        return encode_raw(audio, self.sr, self.fmt)[0]
+
+
+def make_stream_encoder(fmt: str, sr: int) -> StreamEncoder:
+    fmt = (fmt or "wav").lower()
+    if fmt == "wav":
+        return WAVStreamEncoder(sr)
+    if fmt == "pcm":
+        return PCMStreamEncoder(sr)
+    if fmt in G711_FORMATS:
+        return G711StreamEncoder(sr, fmt)
+    if fmt in ("opus", "mp3") and libsndfile_supports(*SNDFILE_CODECS[fmt]):
+        return SoundFileStreamEncoder(sr, fmt)
+    # FLAC needs its STREAMINFO patched after the fact, libsndfile's Vorbis
+    # encoder emits no audio pages for several seconds, and AAC goes through
+    # ffmpeg, so all three are buffered.
+    return BufferedStreamEncoder(sr, fmt)
+
+
+def iter_encoded(chunks: Iterable[np.ndarray], encoder: StreamEncoder) -> Iterator[bytes]:
+    """Encode ``chunks`` lazily, skipping empty writes.
+
+    Encode time is accumulated across the writes and reported once per
+    stream, so per-format stats count whole responses.
+    """
+    ms, nbytes, samples = 0.0, 0, 0
+    for chunk in chunks:
+        t0 = time.perf_counter()
+        data = encoder.write(chunk)
+        ms += (time.perf_counter() - t0) * 1000.0
+        samples += np.asarray(chunk).size
+        if data:
+            nbytes += len(data)
+            yield data
+    t0 = time.perf_counter()
+    tail = encoder.close()
+    ms += (time.perf_counter() - t0) * 1000.0
+    nbytes += len(tail)
+    observe(encoder.fmt, ms, nbytes, samples, encoder.sr)
+    if tail:
+        yield tail
+
+
+def stream_audio(chunks: Iterable[np.ndarray], sr: int, fmt: str) -> Tuple[Iterator[bytes], str]:
+    encoder = make_stream_encoder(fmt, sr)
+    return iter_encoded(chunks, encoder), encoder.content_type
@@ -0,0 +1,49 @@
+# app/tts/voices.py
+"""Voice recipe parsing.
+
+A recipe is one or more voice ids joined with ``+``, each optionally weighted
+with ``*w``: ``af_heart``, ``af_sky+af_bella`` (equal weights) or
+``af_sky*0.7+af_bella*0.3``. Weights are normalized to sum to 1 and the
+blend is done on the style embeddings, so any recipe costs one forward pass.
+"""
+import math
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def parse_recipe(voice: Optional[str]) -> List[Tuple[str, float]]:
+    """``[(voice_id, weight), ...]`` with weights summing to 1; raises ValueError."""
+    parts: List[Tuple[str, float]] = []
+    for item in (voice or settings.default_voice).split("+"):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, weight = item.partition("*")
+        name = name.strip()
+        if not name:
+            raise ValueError(f"Missing voice id in recipe term '{item}'")
+        try:
+            w = float(weight) if sep else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight in recipe term '{item}'")
+        if not math.isfinite(w) or w <= 0:
+            raise ValueError(f"Weight must be a positive finite number in recipe term '{item}'")
+        parts.append((name, w))
+    if not parts:
+        parts = [(settings.default_voice, 1.0)]
+
+    # Merge repeated ids so "a+a+b" and "a*2+b" are the same recipe.
+    merged = {}
+    for name, w in parts:
+        merged[name] = merged.get(name, 0.0) + w
+    total = sum(merged.values())
+    return [(name, w / total) for name, w in sorted(merged.items())]
+
+
+def canonical_recipe(voice: Optional[str]) -> str:
+    """Order- and scale-independent spelling of a recipe, used as a cache key."""
+    parts = parse_recipe(voice)
+    if len(parts) == 1:
+        return parts[0][0]
+    return "+".join(f"{name}*{w:.4f}" for name, w in parts)
@@ -0,0 +1,133 @@
+# app/tts/warmup.py
+"""Startup warmup against the live engine, and the readiness state behind ``/readyz``.
+
+Warmup goes through the same pipeline pool, voice-pack cache and encoders
+the router uses, so the first real request finds the model loaded, the G2P
+front-end built, every preloaded voice pack downloaded and the inference
+path already run once. Each step is timed; a step that fails is recorded
+and the rest still run, but the service only reports ready if the model
+and the default pipeline came up.
+"""
+import logging
+import re
+import threading
+import time
+from typing import Callable, List, Optional
+
+from app.core.config import settings
+from app.tts.encoders import OPUS_SAMPLE_RATES, encode_raw, format_available
+from app.tts.g711 import SAMPLE_RATE as G711_SAMPLE_RATE
+from app.tts.kokoro_engine import NATIVE_SAMPLE_RATE, synthesize_np
+from app.tts.pipeline_pool import pipeline_pool
+from app.tts.resample import resample
+from app.tts.streaming import make_stream_encoder
+
+log = logging.getLogger(__name__)
+
+
+def preload_voices() -> List[str]:
+    """Default voice plus ``KOKORO_PRELOAD_VOICES`` (space or comma separated), deduplicated."""
+    voices = [settings.default_voice] + re.split(r"[\s,]+", settings.preload_voices.strip())
+    return list(dict.fromkeys(v for v in voices if v))
+
+
+def _import_engine() -> None:
+    # Deferred at app import time (see pipeline_pool); timed here as its own step.
+    import torch  # noqa: F401
+    import kokoro  # noqa: F401
+
+
+def _encoder_rate(fmt: str) -> int:
+    if fmt in ("mulaw", "alaw"):
+        return G711_SAMPLE_RATE
+    sr = settings.default_sample_rate
+    if fmt == "opus" and sr not in OPUS_SAMPLE_RATES:
+        return NATIVE_SAMPLE_RATE
+    return sr
+
+
+class Warmup:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "pending"  # pending | running | ready | failed
+        self.steps: List[dict] = []
+        self.started: Optional[float] = None
+        self.total_ms = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def _step(self, name: str, fn: Callable, required: bool = False):
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+            error = None
+        except Exception as e:
+            log.exception("warmup step %s failed", name)
+            result, error = None, f"{type(e).__name__}: {e}"
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            self.steps.append({"step": name, "ms": round(ms, 1), "ok": error is None, "error": error})
+        log.info("warmup %s: %.1f ms%s", name, ms, "" if error is None else f" ({error})")
+        if error is not None and required:
+            raise RuntimeError(f"required warmup step {name} failed: {error}")
+        return result
+
+    def run(self) -> None:
+        """Blocking; run on a worker thread."""
+        with self._lock:
+            self.state = "running"
+            self.started = time.perf_counter()
+        try:
+            self._run()
+            state = "ready"
+        except RuntimeError:
+            state = "failed"
+        with self._lock:
+            self.total_ms = (time.perf_counter() - self.started) * 1000.0
+            self.state = state
+        log.info("warmup %s in %.1f ms", state, self.total_ms)
+
+    def _run(self) -> None:
+        self._step("import", _import_engine, required=True)
+        self._step("model", lambda: pipeline_pool.model, required=True)
+        self._step(f"pipeline:{settings.lang_code}", lambda: pipeline_pool.get(settings.lang_code), required=True)
+
+        audio = None
+        for voice in preload_voices():
+            out = self._step(
+                f"voice:{voice}",
+                lambda v=voice: synthesize_np(settings.warmup_text, voice=v, sample_rate=NATIVE_SAMPLE_RATE)[0],
+            )
+            if audio is None and out is not None:
+                audio = out
+        if audio is None:
+            raise RuntimeError("no voice could be synthesized")
+
+        for fmt in settings.allowed_formats:
+            if not format_available(fmt):
+                # Rejected with a 400 by the router, so nothing to warm.
+                log.warning("warmup: skipping encode:%s, no encoder available", fmt)
+                continue
+            self._step(f"encode:{fmt}", lambda f=fmt: self._encode(audio, f))
+
+    @staticmethod
+    def _encode(audio, fmt: str) -> None:
+        sr = _encoder_rate(fmt)
+        clip = resample(audio, NATIVE_SAMPLE_RATE, sr)
+        encode_raw(clip, sr, fmt)
+        enc = make_stream_encoder(fmt, sr)
+        enc.write(clip)
+        enc.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "total_ms": round(self.total_ms, 1),
+                "steps": list(self.steps),
+            }
+
+
+warmup = Warmup()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the response encoders.
+
+Compares the in-place PCM/WAV fast path (app/tts/pcm.py) with the previous
+soundfile -> BytesIO -> getvalue() path on 1 s, 30 s and 10 min of audio,
+then times every response format: whole-clip encode, and for streaming how
+many bytes are out after the first 250 ms chunk.
+
+Run from the repo root:
+    python scripts/bench_encoders.py [--formats wav,pcm,opus] [--skip-legacy]
+"""
+
+import argparse
+
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tts.encoders import CONTENT_TYPES, encode_raw  # noqa: E402
+from app.tts.pcm import encode_wav, pcm16_bytes  # noqa: E402
+from app.tts.streaming import make_stream_encoder  # noqa: E402
+
+SR = 24000
+DURATIONS = [("1s", 1), ("30s", 30), ("10min", 600)]
+
+
+def legacy_wav(audio, sr):
+    buf = io.BytesIO()
+    sf.write(buf, audio, sr, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+def legacy_pcm(audio, sr):
+    return (audio * 32767.0).astype(np.int16).tobytes()
+
+
+CASES = [
+    ("wav  legacy", legacy_wav),
+    ("wav  fast  ", lambda a, sr: encode_wav(a, sr)),
+    ("pcm  legacy", legacy_pcm),
+    ("pcm  fast  ", lambda a, sr: pcm16_bytes(a)),
+]
+
+
+def bench(fn, audio, repeat):
+    fn(audio, SR)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(audio, SR)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def first_bytes(fmt, audio, chunk):
+    """(bytes out after the first chunk, ms to produce them) for a stream."""
+    enc = make_stream_encoder(fmt, SR)
+    t0 = time.perf_counter()
+    data = enc.write(audio[:chunk])
+    ms = (time.perf_counter() - t0) * 1000.0
+    enc.close()
+    return len(data), ms
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--formats", default=",".join(CONTENT_TYPES))
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    clips = {label: (rng.standard_normal(SR * seconds) * 0.3).astype(np.float32) for label, seconds in DURATIONS}
+
+    if not args.skip_legacy:
+        for label, audio in clips.items():
+            repeat = 50 if audio.size < SR * 60 else 5
+            print(f"--- {label} ({audio.size} samples)")
+            for name, fn in CASES:
+                print(f"{name}  {bench(fn, audio, repeat):9.3f} ms")
+
+    print("--- formats (whole clip, best of N)")
+    print(f"{'fmt':6}" + "".join(f"{label:>12}" for label in clips) + f"{'size/s':>10}{'1st chunk':>16}")
+    for fmt in args.formats.split(","):
+        row = f"{fmt:6}"
+        try:
+            for label, audio in clips.items():
+                repeat = 10 if audio.size < SR * 60 else 1
+                row += f"{bench(lambda a, sr: encode_raw(a, sr, fmt), audio, repeat):10.2f}ms"
+            sample = clips["30s"]
+            size = len(encode_raw(sample, SR, fmt)[0]) / 30.0
+            nbytes, ms = first_bytes(fmt, sample, SR // 4)
+            row += f"{size / 1024:8.1f}KB {nbytes:7d}B {ms:5.2f}ms"
+        except Exception as e:  # e.g. aac without ffmpeg
+            row += f"  unavailable: {type(e).__name__}: {e}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
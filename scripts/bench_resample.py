@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the polyphase resampler (app/tts/resample.py).
+
+Converts 1 s, 30 s and 10 min of 24 kHz audio to each target rate, both in
+one call and pushed in 250 ms chunks as the streaming path does.
+
+Run from the repo root:
+    python scripts/bench_resample.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tts.resample import Resampler, kernel_info, resample  # noqa: E402
+
+SRC = 24000
+TARGETS = [8000, 16000, 22050, 44100, 48000]
+DURATIONS = [("1s", 1), ("30s", 30), ("10min", 600)]
+
+
+def chunked(audio, dst, chunk):
+    r = Resampler(SRC, dst)
+    for i in range(0, audio.size, chunk):
+        r.push(audio[i : i + chunk])
+    r.flush()
+
+
+def timed(fn, repeat):
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main():
+    rng = np.random.default_rng(0)
+    clips = {label: (rng.standard_normal(SRC * s) * 0.3).astype(np.float32) for label, s in DURATIONS}
+    print(f"{'dst':>6} {'up/down/taps':>14}" + "".join(f"{label:>12}" for label in clips) + f"{'10min chunked':>15}")
+    for dst in TARGETS:
+        up, down, taps = kernel_info(SRC, dst)
+        row = f"{dst:>6} {f'{up}/{down}/{taps}':>14}"
+        for label, audio in clips.items():
+            repeat = 20 if audio.size < SRC * 60 else 2
+            row += f"{timed(lambda: resample(audio, SRC, dst), repeat):10.2f}ms"
+        row += f"{timed(lambda: chunked(clips['10min'], dst, SRC // 4), 1):13.1f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
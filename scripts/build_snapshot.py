@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Convert the Kokoro checkpoint and voice packs into an mmap snapshot
+(app/tts/snapshot.py) and compare load times against the pickled files.
+
+    python scripts/build_snapshot.py --out /models/kokoro-snapshot
+    KOKORO_SNAPSHOT_DIR=/models/kokoro-snapshot uvicorn app.main:app ...
+
+Voices default to KOKORO_DEFAULT_VOICE plus KOKORO_PRELOAD_VOICES; pass
+names (downloaded from the hub) or local .pt paths with --voices. --config
+and --checkpoint take local files instead of downloading them.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch  # noqa: E402
+from huggingface_hub import hf_hub_download  # noqa: E402
+from kokoro import KModel  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.tts import snapshot  # noqa: E402
+from app.tts.warmup import preload_voices  # noqa: E402
+
+
+def load_voice(repo_id, voice):
+    path = voice if voice.endswith(".pt") else hf_hub_download(repo_id=repo_id, filename=f"voices/{voice}.pt")
+    name = os.path.splitext(os.path.basename(voice))[0]
+    return name, torch.load(path, weights_only=True)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=settings.snapshot_dir or "kokoro-snapshot")
+    ap.add_argument("--repo-id", default=settings.kokoro_repo_id)
+    ap.add_argument("--config", help="local config.json (default: download)")
+    ap.add_argument("--checkpoint", help="local .pth checkpoint (default: download)")
+    ap.add_argument("--voices", nargs="*", default=None)
+    args = ap.parse_args()
+
+    config_path = args.config or hf_hub_download(repo_id=args.repo_id, filename="config.json")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    checkpoint = args.checkpoint or hf_hub_download(repo_id=args.repo_id, filename=KModel.MODEL_NAMES[args.repo_id])
+
+    model, legacy_ms = timed(lambda: KModel(repo_id=args.repo_id, config=config, model=checkpoint).eval())
+    voices = dict(load_voice(args.repo_id, v) for v in (args.voices if args.voices is not None else preload_voices()))
+
+    _, write_ms = timed(lambda: snapshot.write_snapshot(args.out, model, config, voices))
+    snapshot.read_manifest.cache_clear()
+    mapped, mmap_ms = timed(lambda: snapshot.load_model(args.out).eval())
+
+    ref = model.state_dict()
+    for k, v in mapped.state_dict().items():
+        if not torch.equal(v, ref[k]):
+            raise SystemExit(f"snapshot mismatch in {k}")
+    for name, pack in voices.items():
+        if not torch.equal(snapshot.load_voice(args.out, name), pack):
+            raise SystemExit(f"snapshot mismatch in voice {name}")
+
+    size = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(args.out) for f in fs)
+    print(f"wrote {args.out}: {len(ref)} tensors, {len(voices)} voices, {size / 2**20:.1f} MB in {write_ms:.0f} ms")
+    print(f"load from checkpoint: {legacy_ms:8.1f} ms")
+    print(f"load from snapshot:   {mmap_ms:8.1f} ms  (verified identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup profile of the import chain, from ``python -X importtime``.
+
+Imports a module (default ``app.main``) in a fresh interpreter and prints the
+total, the slowest top-level packages by cumulative time, the app's own
+modules, and which heavy dependencies ended up loaded eagerly.
+
+Run from the repo root:
+    python scripts/profile_imports.py
+    python scripts/profile_imports.py --module app.tts.kokoro_engine --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["torch", "kokoro", "transformers", "misaki", "huggingface_hub", "soundfile", "pydub", "spacy"]
+
+
+def profile(module):
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return rows, loaded
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--module", default="app.main")
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args()
+
+    rows, loaded = profile(args.module)
+    total = next((cum for name, _, cum, _ in rows if name == args.module), 0)
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+
+    print("\nslowest top-level imports (cumulative):")
+    top = sorted((r for r in rows if r[3] <= 1 and "." not in r[0]), key=lambda r: -r[2])
+    for name, _, cum, _ in top[: args.top]:
+        print(f"  {cum / 1000:9.1f} ms  {name}")
+
+    print("\napp modules (cumulative / self):")
+    for name, self_us, cum, _ in sorted((r for r in rows if r[0].startswith("app.")), key=lambda r: -r[2]):
+        print(f"  {cum / 1000:9.1f} / {self_us / 1000:7.1f} ms  {name}")
+
+    print(f"\nheavy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import importlib
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+_GEMINI_PASTE = Path(__file__).resolve().parents[1] / "app" / "gemini_tts.py"
+_GEMINI_MODULES = ("audio_utils", "file_utils", "transport", "cache", "long_text")
+
+
+def _gemini_sources() -> dict:
+    """Sources of the GeminiTTS ``tts`` modules pasted into app/gemini_tts.py, by module name."""
+    text = _GEMINI_PASTE.read_text()
+    text = text[: text.index("# syntax=docker/dockerfile")]
+    file_utils = text.index("import os\nimport re\nimport datetime")
+    sources = {
+        "audio_utils": text[text.index("\nimport struct") : file_utils],
+        "file_utils": text[file_utils : text.index("# tts/")],
+    }
+    heads = list(re.finditer(r"^# (tts/)?([a-z_]+)\.py\n", text, re.M))
+    for head, nxt in zip(heads, heads[1:]):
+        if head.group(1):
+            sources[head.group(2)] = text[head.start() : nxt.start()]
+    return sources
+
+
+@pytest.fixture(scope="session")
+def gemini_tts(tmp_path_factory):
+    """The pasted GeminiTTS ``tts`` package, written out to a temp dir and imported."""
+    pytest.importorskip("httpx")
+    root = tmp_path_factory.mktemp("gemini")
+    pkg = root / "tts"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    sources = _gemini_sources()
+    for name in _GEMINI_MODULES:
+        (pkg / f"{name}.py").write_text(sources[name])
+    sys.path.insert(0, str(root))
+    try:
+        modules = {name: importlib.import_module(f"tts.{name}") for name in _GEMINI_MODULES}
+    finally:
+        sys.path.remove(str(root))
+        for name in [m for m in sys.modules if m == "tts" or m.startswith("tts.")]:
+            del sys.modules[name]
+    return SimpleNamespace(**modules)
@@ -0,0 +1,13 @@
+from app.tts.audio_cache import normalize_text, speech_key
+
+
+def test_normalize_text_collapses_spaces_within_lines():
+    assert normalize_text("  Hello \t  world.  ") == "Hello world."
+    assert normalize_text("Hello \r\n\n  world") == "Hello\nworld"
+
+
+def test_line_breaks_change_the_key():
+    # kokoro_engine splits paragraphs on newlines, so these render differently.
+    args = ("af_heart", 1.0, "a", 24000, "wav")
+    assert speech_key("Hello\nworld", *args) != speech_key("Hello world", *args)
+    assert speech_key("Hello\n\n world", *args) == speech_key("Hello \nworld", *args)
@@ -0,0 +1,159 @@
+import threading
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+from torch import nn  # noqa: E402
+
+from app.tts.batching import BatchScheduler, forward_batch, input_ids  # noqa: E402
+
+H, STYLE = 8, 128
+
+
+class _Bert(nn.Module):
+    """Token embedding plus the masked mean over the sequence, so padding leaks if the mask is ignored."""
+
+    def __init__(self, vocab: int):
+        super().__init__()
+        self.emb = nn.Embedding(vocab, H)
+
+    def forward(self, ids, attention_mask):
+        x = self.emb(ids)
+        m = attention_mask.unsqueeze(-1).float()
+        return x + (x * m).sum(1, keepdim=True) / m.sum(1, keepdim=True)
+
+
+class _DurEncoder(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.rnn = nn.LSTM(H + STYLE, H, batch_first=True, bidirectional=True)
+
+    def forward(self, d_en, s, lengths, mask):
+        x = torch.cat([d_en.transpose(-1, -2), s.unsqueeze(1).expand(-1, d_en.shape[-1], -1)], -1)
+        packed = nn.utils.rnn.pack_padded_sequence(x, lengths, batch_first=True, enforce_sorted=False)
+        x, _ = self.rnn(packed)
+        x, _ = nn.utils.rnn.pad_packed_sequence(x, batch_first=True, total_length=mask.shape[-1])
+        return x.masked_fill(mask.unsqueeze(-1), 0.0)
+
+
+class _Predictor(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.text_encoder = _DurEncoder()
+        self.lstm = nn.LSTM(2 * H, H, batch_first=True, bidirectional=True)
+        self.duration_proj = nn.Linear(2 * H, 4)
+        self.f0 = nn.Linear(2 * H, 1)
+
+    def F0Ntrain(self, en, s):
+        x = self.f0(en.transpose(-1, -2)).squeeze(-1) + s.mean()
+        return x, -x
+
+
+class _TextEncoder(nn.Module):
+    def __init__(self, vocab: int):
+        super().__init__()
+        self.emb = nn.Embedding(vocab, H)
+        self.rnn = nn.LSTM(H, H, batch_first=True)
+
+    def forward(self, ids, lengths, mask):
+        packed = nn.utils.rnn.pack_padded_sequence(self.emb(ids), lengths, batch_first=True, enforce_sorted=False)
+        x, _ = self.rnn(packed)
+        x, _ = nn.utils.rnn.pad_packed_sequence(x, batch_first=True, total_length=mask.shape[-1])
+        return x.masked_fill(mask.unsqueeze(-1), 0.0).transpose(-1, -2)
+
+
+class _StubModel(nn.Module):
+    """Just enough of KModel's interface for ``forward_batch``."""
+
+    device = torch.device("cpu")
+    context_length = 12
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.vocab = {c: i + 1 for i, c in enumerate("abcdefgh")}
+        self.bert = _Bert(len(self.vocab) + 1)
+        self.bert_encoder = nn.Linear(H, H)
+        self.predictor = _Predictor()
+        self.text_encoder = _TextEncoder(len(self.vocab) + 1)
+
+    def decoder(self, asr, F0, N, ref):
+        return (asr.sum(1) + F0 - N + ref.sum()).reshape(1, -1)
+
+
+@pytest.fixture(scope="module")
+def model():
+    return _StubModel().eval()
+
+
+def _item(model, ps, speed=1.0):
+    ref_s = torch.randn(1, 256, generator=torch.Generator().manual_seed(len(ps)))
+    return input_ids(model, ps), ref_s, speed
+
+
+def test_input_ids_adds_boundary_tokens_and_skips_unknown(model):
+    assert input_ids(model, "ab?c") == [0, 1, 2, 3, 0]
+
+
+def test_input_ids_rejects_text_beyond_the_context(model):
+    with pytest.raises(ValueError, match="context"):
+        input_ids(model, "a" * (model.context_length - 1))
+
+
+def test_padded_batch_matches_one_at_a_time(model):
+    items = [_item(model, "abcdefgh"), _item(model, "ab", 1.3), _item(model, "hgfed", 0.8)]
+    batched = forward_batch(model, items)
+    for item, audio in zip(items, batched):
+        (alone,) = forward_batch(model, [item])
+        assert audio.shape == alone.shape
+        torch.testing.assert_close(audio, alone, rtol=1e-5, atol=1e-5)
+
+
+class _Recorder:
+    """Scheduler model stand-in: records batch sizes and returns each item's first token."""
+
+    def __init__(self, model):
+        self.model = model
+        self.sizes = []
+
+    def forward(self, model, items):
+        self.sizes.append(len(items))
+        return [torch.tensor(float(ids[1])) for ids, _, _ in items]
+
+
+def _run(scheduler, model, texts):
+    pack = torch.zeros(len(max(texts, key=len)), 1, 256)
+    results = [None] * len(texts)
+
+    def call(i):
+        results[i] = scheduler.infer(texts[i], pack, 1.0)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results
+
+
+def test_scheduler_flushes_at_max_batch(model, monkeypatch):
+    rec = _Recorder(model)
+    monkeypatch.setattr("app.tts.batching.forward_batch", rec.forward)
+    scheduler = BatchScheduler(lambda: model, max_batch=2, max_wait_ms=10_000)
+    started = time.perf_counter()
+    results = _run(scheduler, model, ["a", "b", "c", "d"])
+    assert time.perf_counter() - started < 5
+    assert rec.sizes == [2, 2]
+    assert [float(audio) for audio, _ in results] == [1.0, 2.0, 3.0, 4.0]
+    assert scheduler.stats()["max_batch_size"] == 2
+
+
+def test_scheduler_flushes_after_max_wait(model, monkeypatch):
+    rec = _Recorder(model)
+    monkeypatch.setattr("app.tts.batching.forward_batch", rec.forward)
+    scheduler = BatchScheduler(lambda: model, max_batch=8, max_wait_ms=50)
+    (audio, delay_ms), = _run(scheduler, model, ["e"])
+    assert rec.sizes == [1]
+    assert float(audio) == 5.0
+    assert 40 <= delay_ms < 2000
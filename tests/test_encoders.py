@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.tts import encoders
+
+
+@pytest.fixture
+def no_ffmpeg(monkeypatch):
+    monkeypatch.setattr(encoders, "FFMPEG", None)
+
+
+def test_aac_unavailable_without_ffmpeg(no_ffmpeg):
+    assert not encoders.format_available("aac")
+    # Formats encoded in-process never depend on ffmpeg.
+    for fmt in ("wav", "pcm", "mulaw", "alaw"):
+        assert encoders.format_available(fmt)
+
+
+def test_aac_available_with_ffmpeg(monkeypatch):
+    monkeypatch.setattr(encoders, "FFMPEG", "/usr/bin/ffmpeg")
+    assert encoders.format_available("aac")
+
+
+def test_router_rejects_unavailable_format(no_ffmpeg):
+    from app.main import app
+
+    r = TestClient(app).post("/v1/audio/speech", json={"input": "Hello.", "response_format": "aac"})
+    assert r.status_code == 400
+    assert "ffmpeg" in r.json()["detail"]
+
+
+def test_warmup_skips_unavailable_format(no_ffmpeg, monkeypatch):
+    from app.tts import warmup as warmup_mod
+
+    w = warmup_mod.Warmup()
+    steps = []
+    monkeypatch.setattr(w, "_step", lambda name, fn, required=False: steps.append(name) or np.zeros(2400, np.float32))
+    monkeypatch.setattr(warmup_mod.settings, "allowed_formats", ["wav", "aac"])
+    w._run()
+    assert "encode:wav" in steps
+    assert "encode:aac" not in steps
@@ -0,0 +1,30 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from app.tts import g711
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    audioop = pytest.importorskip("audioop")
+
+ALL_INT16 = np.arange(-32768, 32768, dtype=np.int16)
+ALL_CODES = bytes(range(256))
+
+LAWS = [
+    ("mulaw", audioop.lin2ulaw, audioop.ulaw2lin),
+    ("alaw", audioop.lin2alaw, audioop.alaw2lin),
+]
+
+
+@pytest.mark.parametrize("law, lin2law, _", LAWS)
+def test_encode_matches_audioop_for_every_int16(law, lin2law, _):
+    expected = np.frombuffer(lin2law(ALL_INT16.tobytes(), 2), dtype=np.uint8)
+    np.testing.assert_array_equal(g711.encode_pcm16(ALL_INT16, law), expected)
+
+
+@pytest.mark.parametrize("law, _, law2lin", LAWS)
+def test_decode_matches_audioop_for_every_code(law, _, law2lin):
+    expected = np.frombuffer(law2lin(ALL_CODES, 2), dtype=np.int16)
+    np.testing.assert_array_equal(g711.decode(ALL_CODES, law), expected)
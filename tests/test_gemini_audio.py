@@ -0,0 +1,35 @@
+import struct
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def audio_utils(gemini_tts):
+    return gemini_tts.audio_utils
+
+
+def test_mulaw_lut_matches_the_reference_for_every_int16(audio_utils):
+    l16 = np.arange(-32768, 32768, dtype="<i2").tobytes()
+    assert audio_utils.l16_to_mulaw(l16) == audio_utils.l16_to_mulaw_slow(l16)
+
+
+def test_mulaw_of_empty_input(audio_utils):
+    assert audio_utils.l16_to_mulaw(b"") == b""
+
+
+def test_wav_header_describes_the_data(audio_utils):
+    l16 = np.arange(100, dtype="<i2").tobytes()
+    wav = audio_utils.ENCODERS["wav"](l16, 16000)
+    riff, size, wave, fmt, _, tag, channels, rate, byte_rate, align, bits, data, n = struct.unpack(
+        "<4sI4s4sIHHIIHH4sI", wav[:44]
+    )
+    assert (riff, wave, fmt, data) == (b"RIFF", b"WAVE", b"fmt ", b"data")
+    assert (tag, channels, rate, byte_rate, align, bits) == (1, 1, 16000, 32000, 2, 16)
+    assert (size, n) == (36 + len(l16), len(l16))
+    assert wav[44:] == l16
+
+
+def test_pcm_is_passed_through(audio_utils):
+    l16 = b"\x01\x02\x03\x04"
+    assert audio_utils.ENCODERS["pcm"](l16, 24000) is l16
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def cache_mod(gemini_tts):
+    return gemini_tts.cache
+
+
+def _on_disk(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def test_key_ignores_whitespace_but_not_voice_or_rate(cache_mod):
+    key = cache_mod.cache_key("m", "Kore", 24000, "Hello  there.\n")
+    assert key == cache_mod.cache_key("m", "Kore", 24000, " Hello there.")
+    assert key != cache_mod.cache_key("m", "Puck", 24000, "Hello there.")
+    assert key != cache_mod.cache_key("m", "Kore", 16000, "Hello there.")
+
+
+def test_hit_and_miss(cache_mod, tmp_path):
+    cache = cache_mod.AudioCache(str(tmp_path), 1 << 20)
+    assert cache.get("ab" * 32) is None
+    assert cache.put("ab" * 32, b"\x01\x02" * 100)
+    assert cache.get("ab" * 32) == b"\x01\x02" * 100
+    assert cache.stats() == {"hits": 1, "misses": 1, "bytes": 200, "max_bytes": 1 << 20}
+
+
+def test_size_survives_a_restart(cache_mod, tmp_path):
+    cache_mod.AudioCache(str(tmp_path), 1 << 20).put("cd" * 32, b"x" * 300)
+    assert cache_mod.AudioCache(str(tmp_path), 1 << 20).stats()["bytes"] == 300
+
+
+def test_least_recently_used_entries_are_evicted(cache_mod, tmp_path):
+    cache = cache_mod.AudioCache(str(tmp_path), 1000)
+    keys = [f"{i:02x}" * 32 for i in range(4)]
+    for i, key in enumerate(keys[:3]):
+        cache.put(key, b"x" * 300)
+        stamp = time.time() - 100 + i
+        os.utime(cache._path(key), (stamp, stamp))
+    cache.get(keys[0])  # now the most recently used
+    cache.put(keys[3], b"x" * 300)
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(k) is not None for k in (keys[0], keys[2], keys[3]))
+    assert cache.stats()["bytes"] == 900 == _on_disk(tmp_path)
+
+
+def test_entry_larger_than_the_cache_is_rejected(cache_mod, tmp_path):
+    cache = cache_mod.AudioCache(str(tmp_path), 1000)
+    cache.put("aa" * 32, b"x" * 500)
+    assert not cache.put("bb" * 32, b"x" * 1001)
+    assert cache.get("aa" * 32) is not None
+    assert cache.stats()["bytes"] == 500 == _on_disk(tmp_path)
+
+
+def test_concurrent_puts_of_one_key_keep_the_size_exact(cache_mod, tmp_path):
+    cache = cache_mod.AudioCache(str(tmp_path), 1 << 20)
+    key = "ee" * 32
+
+    def put_many(size):
+        for _ in range(200):
+            cache.put(key, b"x" * size)
+
+    threads = [threading.Thread(target=put_many, args=(size,)) for size in (100, 200, 300, 400)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.stats()["bytes"] == _on_disk(tmp_path)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+TEXT = (
+    "The quick brown fox jumps over the lazy dog. Is it raining? "
+    'She said "no!" and left. Then, after a long pause, everyone went home… Fin.'
+)
+
+
+@pytest.fixture(scope="module")
+def long_text(gemini_tts):
+    return gemini_tts.long_text
+
+
+def _l16(values):
+    return np.asarray(values, dtype="<i2").tobytes()
+
+
+@pytest.mark.parametrize("max_chars", [46, 80, 600])
+def test_chunks_are_whole_sentences_within_the_limit(long_text, max_chars):
+    chunks = long_text.split_sentences(TEXT, max_chars)
+    assert all(len(c) <= max_chars for c in chunks)
+    assert " ".join(chunks) == TEXT
+    assert all(c.endswith((".", "?", '"', "…")) for c in chunks)
+
+
+def test_sentence_ends_include_closing_quotes(long_text):
+    assert long_text.split_sentences('He said "no!" Then left.', 10) == ['He said', '"no!"', "Then left."]
+
+
+def test_overlong_sentence_is_cut_at_spaces_then_hard(long_text):
+    assert long_text.split_sentences("aaaa bbbb cccc", 9) == ["aaaa bbbb", "cccc"]
+    assert long_text.split_sentences("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_blank_text_has_no_chunks(long_text):
+    assert long_text.split_sentences("  \n ") == []
+
+
+def test_join_overlaps_each_seam_by_the_fade(long_text):
+    sr, fade_ms = 1000, 30
+    parts = [_l16(np.full(n, 1000)) for n in (200, 100, 20, 300)]
+    joined = np.frombuffer(long_text.crossfade_join(parts, sr, fade_ms), dtype="<i2")
+    # The 20-sample part is shorter than the fade, so that seam overlaps by 20.
+    assert joined.size == 620 - 30 - 20 - 20
+    assert np.all(joined == 1000)
+
+
+def test_join_ramps_linearly_from_one_part_to_the_next(long_text):
+    joined = np.frombuffer(long_text.crossfade_join([_l16([0] * 10), _l16([1000] * 10)], 1000, 4), dtype="<i2")
+    assert joined.tolist() == [0] * 6 + [0, 250, 500, 750] + [1000] * 6
+
+
+def test_join_skips_empty_parts(long_text):
+    part = _l16([1, 2, 3])
+    assert long_text.crossfade_join([b"", part, b""], 24000) == part
+    assert long_text.crossfade_join([], 24000) == b""
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+URL = "https://gemini.test/v1/models/tts:generateContent"
+
+
+@pytest.fixture
+def transport(gemini_tts):
+    return gemini_tts.transport
+
+
+@pytest.fixture
+def sleeps(transport, monkeypatch):
+    """Backoff waits, recorded instead of slept."""
+    waits = []
+
+    async def async_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(transport, "time", SimpleNamespace(sleep=waits.append, monotonic=time.monotonic))
+    monkeypatch.setattr(transport, "asyncio", SimpleNamespace(sleep=async_sleep, Semaphore=asyncio.Semaphore))
+    return waits
+
+
+def _replies(*replies):
+    """httpx handler answering with ``replies`` in order; an exception instance is raised."""
+    calls = []
+
+    def handler(request):
+        reply = replies[min(len(calls), len(replies) - 1)]
+        calls.append(request)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    return handler, calls
+
+
+def _sync(mod, handler, **retry):
+    t = mod.Transport(retry=mod.RetryPolicy(**retry))
+    t.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return t
+
+
+def test_retries_5xx_until_success(transport, sleeps):
+    handler, calls = _replies(httpx.Response(503), httpx.Response(500), httpx.Response(200, json={}))
+    t = _sync(transport, handler)
+    assert t.post_json(URL, {}).status_code == 200
+    assert (len(calls), t.retries, len(sleeps)) == (3, 2, 2)
+
+
+def test_gives_up_after_max_retries(transport, sleeps):
+    handler, calls = _replies(httpx.Response(503))
+    t = _sync(transport, handler, max_retries=2)
+    assert t.post_json(URL, {}).status_code == 503
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried(transport, sleeps):
+    handler, calls = _replies(httpx.Response(400), httpx.Response(200))
+    t = _sync(transport, handler)
+    assert t.post_json(URL, {}).status_code == 400
+    assert (len(calls), sleeps) == (1, [])
+
+
+def test_transport_errors_are_retried_then_raised(transport, sleeps):
+    handler, calls = _replies(httpx.ConnectError("refused"))
+    t = _sync(transport, handler, max_retries=2)
+    with pytest.raises(httpx.ConnectError):
+        t.post_json(URL, {})
+    assert len(calls) == 3
+
+
+def test_retry_after_is_the_minimum_wait(transport, sleeps):
+    handler, _ = _replies(httpx.Response(429, headers={"Retry-After": "3"}), httpx.Response(200))
+    t = _sync(transport, handler, backoff_base_s=0.01)
+    assert t.post_json(URL, {}).status_code == 200
+    assert sleeps == [3.0]
+
+
+def test_backoff_is_full_jitter_under_an_exponential_cap(transport):
+    policy = transport.RetryPolicy(backoff_base_s=0.25, backoff_max_s=1.0)
+    for attempt, cap in [(0, 0.25), (1, 0.5), (2, 1.0), (5, 1.0)]:
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert 0.0 <= min(delays) and max(delays) <= cap
+        assert max(delays) > cap / 2
+    capped = httpx.Response(429, headers={"Retry-After": "60"})
+    assert policy.delay(0, capped) == 1.0
+
+
+def test_async_transport_retries(transport, sleeps):
+    handler, calls = _replies(httpx.Response(502), httpx.Response(200, json={}))
+
+    async def run():
+        t = transport.AsyncTransport(retry=transport.RetryPolicy())
+        t.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return (await t.post_json(URL, {})).status_code, t.retries
+        finally:
+            await t.aclose()
+
+    assert asyncio.run(run()) == (200, 1)
+    assert len(calls) == 2 and len(sleeps) == 1
+
+
+def test_rate_limiter_spaces_request_starts(transport):
+    limiter = transport.RateLimiter(rps=10)
+    waits = [limiter.reserve() for _ in range(3)]
+    assert waits[0] == 0.0
+    assert waits[1] == pytest.approx(0.1, abs=0.01)
+    assert waits[2] == pytest.approx(0.2, abs=0.01)
+    assert transport.RateLimiter(rps=0).reserve() == 0.0
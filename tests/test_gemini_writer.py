@@ -0,0 +1,27 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def writer(gemini_tts):
+    return gemini_tts.file_utils.BackgroundWriter()
+
+
+def test_flush_waits_for_every_submitted_file(writer, tmp_path):
+    paths = [tmp_path / f"{i}.wav" for i in range(20)]
+    for i, path in enumerate(paths):
+        writer.submit(str(path), bytes([i]) * 1000)
+    writer.flush()
+    assert [p.read_bytes() for p in paths] == [bytes([i]) * 1000 for i in range(20)]
+    assert (writer.written, writer.failed) == (20, 0)
+
+
+def test_failed_write_is_logged_and_the_writer_keeps_going(writer, tmp_path, caplog):
+    with caplog.at_level(logging.ERROR):
+        writer.submit(str(tmp_path / "missing" / "a.wav"), b"x")
+        writer.submit(str(tmp_path / "b.wav"), b"y")
+        writer.flush()
+    assert (writer.written, writer.failed) == (1, 1)
+    assert (tmp_path / "b.wav").read_bytes() == b"y"
+    assert "could not write" in caplog.text
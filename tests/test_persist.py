@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.tts.persist import AudioPersister
+
+SR = 24000
+
+
+def _clip(seed: int, seconds: float = 0.1) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(-0.5, 0.5, int(SR * seconds)).astype(np.float32)
+
+
+def _persister(root, max_queue=8, batch_size=4, max_bytes=1 << 30, retention_s=0.0) -> AudioPersister:
+    return AudioPersister(str(root), max_queue, batch_size, max_bytes, retention_s)
+
+
+def _wavs(root):
+    return sorted(n for n in os.listdir(root) if n.endswith(".wav"))
+
+
+def test_queue_full_skips_without_blocking(tmp_path, monkeypatch):
+    p = _persister(tmp_path, max_queue=1)
+    entered, release = threading.Event(), threading.Event()
+    write = p._write
+
+    def slow_write(*args):
+        entered.set()
+        release.wait(5)
+        return write(*args)
+
+    monkeypatch.setattr(p, "_write", slow_write)
+    assert p.submit(_clip(0), SR)
+    assert entered.wait(5)          # writer busy with the first clip
+    assert p.submit(_clip(1), SR)   # fills the one queue slot
+    assert not p.submit(_clip(2), SR)
+    release.set()
+    p.close()
+    s = p.stats()
+    assert (s["queued"], s["skipped_queue_full"], s["saved"], s["errors"]) == (2, 1, 2, 0)
+
+
+def test_identical_audio_is_written_once(tmp_path):
+    p = _persister(tmp_path)
+    assert p.submit(_clip(0), SR)
+    assert p.submit(_clip(0), SR)
+    p.close()
+    s = p.stats()
+    assert (s["saved"], s["deduped"]) == (1, 1)
+    assert len(_wavs(tmp_path)) == 1
+
+
+def test_old_files_are_removed(tmp_path):
+    old = tmp_path / "out-old.wav"
+    old.write_bytes(b"RIFF")
+    stale = time.time() - 3600
+    os.utime(old, (stale, stale))
+    p = _persister(tmp_path, retention_s=60.0)
+    p.submit(_clip(0), SR)
+    p.close()
+    assert not old.exists()
+    assert len(_wavs(tmp_path)) == 1
+    assert p.stats()["evicted"] == 1
+
+
+def test_oldest_files_are_removed_past_the_size_limit(tmp_path):
+    one_file = 44 + 2 * int(SR * 0.1)
+    p = _persister(tmp_path, batch_size=1, max_bytes=one_file + 100)
+    for seed in range(3):
+        p.submit(_clip(seed), SR)
+    p.close()
+    s = p.stats()
+    assert (s["saved"], s["evicted"], s["files"]) == (3, 2, 1)
+    assert s["bytes"] == one_file
+
+
+def test_unusable_directory_counts_errors_not_skips(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_bytes(b"")
+    p = _persister(blocker / "out")
+    p._ensure_started()
+    p._thread.join(5)
+    assert not p.submit(_clip(0), SR)
+    s = p.stats()
+    assert (s["writer_alive"], s["errors"], s["skipped_queue_full"]) == (False, 1, 0)
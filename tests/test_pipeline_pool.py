@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+import pytest
+
+from app.tts.pipeline_pool import LANG_ALIASES, LANG_CODES, normalize_lang_code
+
+
+def test_normalize_lang_code():
+    assert normalize_lang_code("EN-GB") == "b"
+    assert normalize_lang_code("a") == "a"
+
+
+def test_normalize_lang_code_does_not_import_kokoro():
+    # It runs on the event loop for every request, cache hits included.
+    probe = (
+        "import sys; from app.tts.pipeline_pool import normalize_lang_code; "
+        "normalize_lang_code('en-us'); print('kokoro' in sys.modules, 'torch' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False"]
+
+
+def test_lang_tables_match_kokoro():
+    pipeline = pytest.importorskip("kokoro.pipeline")
+    assert LANG_ALIASES == pipeline.ALIASES
+    assert LANG_CODES == set(pipeline.LANG_CODES)
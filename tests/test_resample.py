@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.tts.resample import Resampler, resample
+
+SR = 24000
+RATES = [8000, 16000, 22050, 44100, 48000]
+
+
+def _tone(freq: float, seconds: float = 1.0, sr: int = SR) -> np.ndarray:
+    t = np.arange(int(sr * seconds)) / sr
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def _rms(x: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(np.square(x, dtype=np.float64))))
+
+
+@pytest.mark.parametrize("dst", RATES)
+def test_chunked_matches_whole_clip(dst):
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, SR).astype(np.float32)
+    whole = resample(audio, SR, dst)
+    r = Resampler(SR, dst)
+    sizes = np.random.default_rng(1).integers(1, 3000, 64)
+    bounds = np.minimum(np.cumsum(np.concatenate([[0], sizes])), audio.size)
+    parts = [r.push(audio[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+    parts.append(r.push(audio[bounds[-1]:]))
+    parts.append(r.flush())
+    chunked = np.concatenate(parts)
+    assert chunked.shape == whole.shape
+    assert np.max(np.abs(chunked - whole)) <= 1.2e-7
+
+
+@pytest.mark.parametrize("dst", RATES)
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 299, 24000, 24001])
+def test_output_length(dst, n):
+    out = resample(np.zeros(n, dtype=np.float32), SR, dst)
+    assert out.size == math.ceil(n * dst / SR)
+
+
+def test_same_rate_is_passthrough():
+    audio = _tone(440)
+    assert resample(audio, SR, SR) is audio
+
+
+def test_passband_tone_is_kept():
+    out = resample(_tone(1000), SR, 8000)
+    assert _rms(out[800:-800]) == pytest.approx(0.5 / math.sqrt(2), rel=0.01)
+
+
+def test_tone_above_output_nyquist_is_rejected():
+    # 11 kHz would alias to 3 kHz at 8 kHz; it must be filtered out instead.
+    out = resample(_tone(11000), SR, 8000)
+    assert _rms(out[800:-800]) < 1e-3 * 0.5
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import httpx
+import numpy as np
+import pytest
+
+from app.routers import openai_compatible as router
+from app.tts.executor import SynthesisExecutor
+
+RETRY_AFTER = 7
+BODY = {"input": "Hello there.", "response_format": "pcm", "save": False}
+
+
+@pytest.fixture
+def blocked(monkeypatch):
+    """Every synthesis blocks until the returned event is set."""
+    release = threading.Event()
+
+    def synthesize_np(text, voice=None, speed=1.0, lang_code=None, sample_rate=None):
+        release.wait(5)
+        return np.zeros(2400, dtype=np.float32), sample_rate or 24000
+
+    monkeypatch.setattr(router, "synthesize_np", synthesize_np)
+    monkeypatch.setattr(router, "audio_cache", None)
+    yield release
+    release.set()
+
+
+def _saturate(monkeypatch, max_queue, queue_timeout):
+    executor = SynthesisExecutor(workers=1, max_queue=max_queue, queue_timeout=queue_timeout, retry_after=RETRY_AFTER)
+    monkeypatch.setattr(router, "executor", executor)
+    return executor
+
+
+async def _second_request_while_busy(executor, release):
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/v1/audio/speech", json=BODY))
+        while executor.stats()["running"] < 1:
+            await asyncio.sleep(0.005)
+        second = await client.post("/v1/audio/speech", json=BODY)
+        release.set()
+        return await first, second
+
+
+def test_full_queue_is_rejected_with_429(monkeypatch, blocked):
+    executor = _saturate(monkeypatch, max_queue=0, queue_timeout=5.0)
+    try:
+        first, second = asyncio.run(_second_request_while_busy(executor, blocked))
+    finally:
+        executor.shutdown()
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == str(RETRY_AFTER)
+    assert executor.stats()["running"] == 0
+
+
+def test_queue_timeout_is_rejected_with_503(monkeypatch, blocked):
+    executor = _saturate(monkeypatch, max_queue=1, queue_timeout=0.05)
+    try:
+        first, second = asyncio.run(_second_request_while_busy(executor, blocked))
+    finally:
+        executor.shutdown()
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == str(RETRY_AFTER)
+    assert executor.stats() == {"workers": 1, "running": 0, "waiting": 0, "max_queue": 1}
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.routers import openai_compatible as router
+from app.tts.executor import executor
+
+
+def _fake_synthesize_iter(text, voice=None, speed=1.0, lang_code=None, sample_rate=None):
+    sr = sample_rate or 24000
+    return iter([np.zeros(sr // 10, dtype=np.float32)] * 3), sr
+
+
+@pytest.fixture(autouse=True)
+def fake_engine(monkeypatch):
+    monkeypatch.setattr(router, "synthesize_iter", _fake_synthesize_iter)
+    monkeypatch.setattr(router, "audio_cache", None)
+
+
+def _request(send, spec_version="2.4"):
+    from app.main import app
+
+    body = json.dumps({"input": "Hello there.", "response_format": "pcm", "stream": True, "save": False}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": spec_version}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/v1/audio/speech", "raw_path": b"/v1/audio/speech",
+        "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 8080),
+    }
+    sent = []
+
+    async def receive():
+        if not sent:
+            sent.append(True)
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def run():
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            pass
+
+    asyncio.run(run())
+
+
+def test_stream_completes_and_frees_the_slot():
+    chunks = []
+
+    async def send(message):
+        chunks.append(message)
+
+    _request(send)
+    assert chunks[0]["status"] == 200
+    assert sum(len(m.get("body", b"")) for m in chunks[1:]) == 3 * 2400 * 2
+    assert executor.stats()["running"] == 0
+
+
+def test_disconnect_before_response_start_frees_the_slot():
+    async def send(message):
+        raise OSError("client disconnected")
+
+    for _ in range(executor.workers + 1):
+        _request(send)
+    assert executor.stats()["running"] == 0
+
+
+def test_setup_error_after_acquire_frees_the_slot(monkeypatch):
+    def broken_stream_audio(chunks, sr, fmt):
+        raise RuntimeError("encoder setup failed")
+
+    monkeypatch.setattr(router, "stream_audio", broken_stream_audio)
+
+    async def send(message):
+        pass
+
+    _request(send)
+    assert executor.stats()["running"] == 0
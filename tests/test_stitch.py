@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.tts import kokoro_engine
+from app.tts.stitch import Crossfader
+
+
+def _segments(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(-0.5, 0.5, n).astype(np.float32) for n in lengths]
+
+
+def _one_shot(segments, overlap):
+    """Reference: overlap-add every segment boundary with equal-power fades."""
+    t = np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32)
+    out = segments[0]
+    for seg in segments[1:]:
+        joint = out[-overlap:] * np.cos(t) + seg[:overlap] * np.sin(t)
+        out = np.concatenate([out[:-overlap], joint, seg[overlap:]])
+    return out
+
+
+def _streamed(segments, overlap):
+    fader = Crossfader(overlap)
+    parts = [fader.push(s) for s in segments]
+    return np.concatenate(parts + [fader.flush()])
+
+
+@pytest.mark.parametrize("lengths", [[500], [500, 300, 1000], [240, 240, 240], [1000, 241, 700, 999]])
+def test_streamed_matches_one_shot(lengths):
+    overlap = 240
+    segments = _segments(lengths)
+    streamed = _streamed(segments, overlap)
+    assert streamed.size == sum(lengths) - overlap * (len(lengths) - 1)
+    np.testing.assert_allclose(streamed, _one_shot(segments, overlap), rtol=0, atol=1e-6)
+
+
+def test_push_holds_back_only_the_overlap():
+    fader = Crossfader(100)
+    assert fader.push(np.ones(300, dtype=np.float32)).size == 200
+    assert fader.push(np.ones(300, dtype=np.float32)).size == 200
+    assert fader.flush().size == 100
+    assert fader.flush().size == 0
+
+
+def test_zero_overlap_is_plain_concatenation():
+    segments = _segments([500, 0, 300])
+    fader = Crossfader(0)
+    out = [fader.push(s) for s in segments]
+    assert all(o is s for o, s in zip(out, segments))
+    assert fader.flush().size == 0
+
+
+def test_zero_crossfade_setting_concatenates_segments(monkeypatch):
+    segments = _segments([500, 300, 700])
+    rendered = iter(segments)
+    monkeypatch.setattr(kokoro_engine.settings, "segment_crossfade_ms", 0.0)
+    monkeypatch.setattr(kokoro_engine, "pipeline_pool", SimpleNamespace(model=None, load_recipe=lambda voice: None))
+    monkeypatch.setattr(kokoro_engine, "_render_sentence", lambda *args: next(rendered))
+    chunks = list(kokoro_engine._iter_segments(None, ["a.", "b.", "c."], "af_heart", 1.0))
+    np.testing.assert_array_equal(np.concatenate(chunks), np.concatenate(segments))
+    assert len(chunks) == 3
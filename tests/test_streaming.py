@@ -0,0 +1,78 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.tts.encoders import SNDFILE_CODECS, encode, libsndfile_supports
+from app.tts.g711 import SAMPLE_RATE as G711_SAMPLE_RATE
+from app.tts.streaming import (
+    CACHEABLE_STREAM_FORMATS,
+    BufferedStreamEncoder,
+    StreamEncoder,
+    finalize_wav_header,
+    make_stream_encoder,
+    stream_audio,
+)
+
+SR = 24000
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(SR * seconds)) / SR
+    return (0.3 * np.sin(2 * np.pi * 440.0 * t)).astype(np.float32)
+
+
+@pytest.mark.skipif(not libsndfile_supports(*SNDFILE_CODECS["mp3"]), reason="libsndfile without MP3")
+@pytest.mark.parametrize("seconds", [3, 10])
+def test_streamed_mp3_decodes_in_full(seconds):
+    audio = _tone(seconds)
+    stream, ctype = stream_audio(iter(np.array_split(audio, 12)), SR, "mp3")
+    blob = b"".join(bytes(b) for b in stream)
+    assert ctype == "audio/mpeg"
+
+    decoded, sr = sf.read(io.BytesIO(blob), dtype="float32")
+    assert sr == SR
+    # Without a LAME tag the encoder delay and padding are not trimmed, so
+    # allow up to two extra frames but never fewer samples than went in.
+    assert audio.size <= decoded.size <= audio.size + 2 * 1152
+
+
+@pytest.mark.parametrize("fmt", sorted(CACHEABLE_STREAM_FORMATS))
+def test_cacheable_streams_match_one_shot_encode(fmt):
+    # These streams land in the response cache and are then served to
+    # non-streamed requests, so they must be the exact same bytes.
+    sr = G711_SAMPLE_RATE if fmt in ("mulaw", "alaw") else SR
+    audio = _tone(1)
+    stream, _ = stream_audio(iter(np.array_split(audio, 5)), sr, fmt)
+    blob = b"".join(bytes(b) for b in stream)
+    if fmt == "wav":
+        blob = finalize_wav_header(blob)
+    assert blob == bytes(encode(audio, sr, fmt)[0])
+
+
+# Formats the README promises to stream incrementally.
+INCREMENTAL = ["wav", "pcm", "mp3", "opus", "mulaw", "alaw"]
+
+
+@pytest.mark.parametrize("fmt", INCREMENTAL)
+def test_incremental_formats_emit_audio_per_chunk(fmt):
+    if fmt in SNDFILE_CODECS and not libsndfile_supports(*SNDFILE_CODECS[fmt]):
+        pytest.skip(f"libsndfile without {fmt}")
+    sr = G711_SAMPLE_RATE if fmt in ("mulaw", "alaw") else SR
+    encoder = make_stream_encoder(fmt, sr)
+    assert not isinstance(encoder, BufferedStreamEncoder)
+    audio = _tone(6) if sr == SR else _tone(6)[::3]
+    # 250 ms chunks: every one of them has to put audio on the wire.
+    sizes = [len(encoder.write(chunk)) for chunk in np.array_split(audio, 24)]
+    assert all(n > 0 for n in sizes), sizes
+
+
+@pytest.mark.parametrize("fmt", ["flac", "ogg"])
+def test_non_incremental_formats_are_buffered(fmt):
+    assert isinstance(make_stream_encoder(fmt, SR), BufferedStreamEncoder)
+
+
+def test_stream_encoder_base_is_abstract():
+    with pytest.raises(TypeError):
+        StreamEncoder(SR)
@@ -0,0 +1,14 @@
+import pytest
+
+from app.tts.voices import canonical_recipe, parse_recipe
+
+
+def test_weights_are_normalized():
+    assert parse_recipe("af_sky*3+af_bella") == [("af_bella", 0.25), ("af_sky", 0.75)]
+    assert canonical_recipe("af_bella+af_sky") == canonical_recipe("af_sky*2+af_bella*2")
+
+
+@pytest.mark.parametrize("weight", ["0", "-1", "inf", "-inf", "nan", "1e400", "x"])
+def test_bad_weights_are_rejected(weight):
+    with pytest.raises(ValueError):
+        parse_recipe(f"af_sky*{weight}+af_bella")